@@ -0,0 +1,162 @@
+"""
+Dashboard aggregates computed server-side from a scored frame: risk counts,
+summary means, per-dimension overrun statistics and the worst projects.
+
+The dashboard fetches these (kilobytes) instead of every scored row.
+Results are cached by the caller's key, e.g. upload digest + model version.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from risk import RISK_LABELS
+from serialization import json_records
+
+
+DIMENSIONS = ["ProjectType", "Terrain", "Vendor", "Season"]
+GROUPABLE = DIMENSIONS + ["WeatherImpact", "DemandSupply", "State", "Overall_Risk"]
+DEFAULT_PERCENTILES = (50, 90)
+DEFAULT_TOP_N = 10
+OVERRUN_COLUMNS = ["Cost_Overrun_Pct", "Timeline_Overrun_Pct"]
+SUMMARY_COLUMNS = ["Predicted_Cost", "Predicted_Timeline", "EstimatedCost", "EstimatedTimeline"] + OVERRUN_COLUMNS
+TOP_COLUMNS = ["ProjectID", "ProjectType", "Terrain", "Vendor", "Predicted_Cost", "Predicted_Timeline",
+               "Cost_Overrun_Pct", "Timeline_Overrun_Pct", "Overall_Risk"]
+_SEASONS = np.array(["Q1", "Q2", "Q3", "Q4"], dtype=object)
+
+
+def _season(df: pd.DataFrame) -> pd.Series:
+    # Same quarters as add_derived_features' Season
+    month = pd.to_numeric(df["StartMonth"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    known = np.isfinite(month)
+    season = np.full(len(df), None, dtype=object)
+    season[known] = _SEASONS[(month[known].astype(np.int64) % 12) // 3]
+    return pd.Series(season, index=df.index, name="Season")
+
+
+def _float(value) -> Optional[float]:
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def _risk_counts(risk: pd.Series) -> dict:
+    counts = risk.value_counts()
+    return {label: int(counts.get(label, 0)) for label in RISK_LABELS + ["Unknown"]}
+
+
+def mean_abs_overrun(df: pd.DataFrame) -> np.ndarray:
+    """The quantity Overall_Risk bands: mean |overrun| over the finite cost/timeline values."""
+    over = np.abs(df[[c for c in OVERRUN_COLUMNS if c in df.columns]].to_numpy(dtype=np.float64, na_value=np.nan))
+    finite = np.isfinite(over)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(finite, over, 0.0).sum(axis=1) / finite.sum(axis=1)
+
+
+def group_stats(df: pd.DataFrame, column: str, percentiles: Sequence[float]) -> List[dict]:
+    """Count, risk split, means and overrun percentiles per value of ``column`` (missing values as "Unknown")."""
+    metrics = [c for c in SUMMARY_COLUMNS if c in df.columns]
+    overruns = [c for c in OVERRUN_COLUMNS if c in df.columns]
+    keys = df[column]
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        keys = keys.cat.remove_unused_categories()
+    grouped = df[metrics].astype(np.float64).groupby(keys, observed=True, dropna=False, sort=True)
+
+    sizes = grouped.size()
+    means = grouped.mean()
+    quantiles = grouped[overruns].quantile([p / 100 for p in percentiles]) if overruns and percentiles else None
+    risk = (df["Overall_Risk"].groupby(keys, observed=True, dropna=False).value_counts().unstack(fill_value=0)
+            if "Overall_Risk" in df.columns else None)
+
+    out = []
+    for key, size in sizes.items():
+        row = {"name": "Unknown" if pd.isna(key) else str(key), "count": int(size)}
+        if risk is not None:
+            counts = risk.loc[key]
+            row["risk_counts"] = {label: int(counts.get(label, 0)) for label in RISK_LABELS + ["Unknown"]}
+        for col in metrics:
+            row[f"mean_{col}"] = _float(means.at[key, col])
+        if quantiles is not None:
+            block = quantiles.loc[key]
+            for p, q in zip(percentiles, block.index):
+                for col in overruns:
+                    row[f"p{p:g}_{col}"] = _float(block.at[q, col])
+        out.append(row)
+    # Categorical uploads group in category order; sort by name so every input format agrees
+    return sorted(out, key=lambda row: (row["name"] == "Unknown", row["name"]))
+
+
+def top_projects(df: pd.DataFrame, n: int) -> List[dict]:
+    """The ``n`` projects with the largest mean absolute overrun, worst first."""
+    if n <= 0 or len(df) == 0 or not any(c in df.columns for c in OVERRUN_COLUMNS):
+        return []
+    score = np.nan_to_num(mean_abs_overrun(df), nan=-np.inf)
+    n = min(n, len(df))
+    top = np.argpartition(-score, n - 1)[:n]
+    top = top[np.argsort(-score[top], kind="stable")]
+    picked = df.iloc[top][[c for c in TOP_COLUMNS if c in df.columns]]
+    return json_records(picked.assign(Mean_Abs_Overrun_Pct=score[top]))
+
+
+def aggregate(df: pd.DataFrame, dimensions: Sequence[str] = DIMENSIONS,
+              percentiles: Sequence[float] = DEFAULT_PERCENTILES, top_n: int = DEFAULT_TOP_N) -> dict:
+    """All dashboard aggregates of a scored frame (the output of ``predict_df``)."""
+    unknown = [d for d in dimensions if d not in GROUPABLE]
+    if unknown:
+        raise ValueError(f"Cannot group by {unknown}; choose from {GROUPABLE}")
+    if "Season" in dimensions and "Season" not in df.columns and "StartMonth" in df.columns:
+        df = df.assign(Season=_season(df))
+
+    summary = {f"mean_{c}": _float(df[c].astype(np.float64).mean()) for c in SUMMARY_COLUMNS if c in df.columns}
+    for col in ["Predicted_Cost", "Predicted_Timeline"]:
+        if col in df.columns:
+            summary[f"min_{col}"] = _float(df[col].min()) if len(df) else None
+            summary[f"max_{col}"] = _float(df[col].max()) if len(df) else None
+    for col, name in zip(OVERRUN_COLUMNS, ["cost", "timeline"]):
+        if col in df.columns:
+            summary[f"{name}_over_estimate"] = int((df[col].to_numpy(dtype=np.float64, na_value=np.nan) > 0).sum())
+    return {
+        "rows": len(df),
+        "risk_counts": _risk_counts(df["Overall_Risk"]) if "Overall_Risk" in df.columns else None,
+        "summary": summary,
+        "groups": {d: group_stats(df, d, percentiles) for d in dimensions if d in df.columns},
+        "top": top_projects(df, top_n),
+    }
+
+
+class ResultCache:
+    """Small thread-safe LRU of computed results."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,11 +1,32 @@
 #!/usr/bin/env python3
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import Depends, FastAPI, UploadFile, File, Form, HTTPException, Header, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
 import pandas as pd
 import numpy as np
-import joblib
-from feature_engineering import apply_feature_engineering
-from schema import validate_and_standardize
+import os
+import hashlib
+import hmac
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from aggregates import DEFAULT_PERCENTILES, DEFAULT_TOP_N, DIMENSIONS, ResultCache, aggregate
+from drift import DriftMonitor
+from data_io import iter_chunks, projected_columns, sniff_format
+from schema import csv_dtypes, validate_and_standardize
+from scenarios import parse_sweep, run_sweep
+from explain import DEFAULT_TOP_K, explain_frame
+from risk import assign_risk, LOW_RISK_THRESHOLD, HIGH_RISK_THRESHOLD
+from batching import LATENCY_BUCKETS, MicroBatcher
+from metrics import Registry
+from model_bundle import ModelBundle
+from portfolio_store import FILTER_COLUMNS, PortfolioStore
+from prediction_cache import PredictionCache
+from profiling import StackSampler, profile_path
+from serialization import negotiate_format, render, select_fields
 
 
 app = FastAPI(title="PowerGrid ML API")
@@ -17,74 +38,722 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-models = None
-feature_names = None
-
-
-def load_models():
-    global models, feature_names
-    if models is None:
-        models = joblib.load('best_models.pkl')
-        feature_names = models.get('feature_names')
-
-
-def predict_df(df: pd.DataFrame) -> pd.DataFrame:
-    load_models()
-    df, _ = validate_and_standardize(df)
-
-    X = apply_feature_engineering(df.drop(columns=[c for c in ["TotalCost", "Timeline"] if c in df.columns]))
-    X = X.select_dtypes(include=[np.number])
-    if feature_names is not None:
-        X = X.reindex(columns=feature_names, fill_value=0)
-
-    # Overrun models take precedence
-    if "cost_overrun_model" in models and "timeline_overrun_model" in models:
-        cost_over = models["cost_overrun_model"].predict(X)
-        time_over = models["timeline_overrun_model"].predict(X)
-        cost_base = df["EstimatedCost"] if "EstimatedCost" in df.columns else df.get("TotalCost", pd.Series(0, index=df.index))
-        time_base = df["EstimatedTimeline"] if "EstimatedTimeline" in df.columns else df.get("Timeline", pd.Series(0, index=df.index))
-        df["Predicted_Cost"] = cost_base * (1.0 + cost_over / 100.0)
-        df["Predicted_Timeline"] = time_base * (1.0 + time_over / 100.0)
-        df["Cost_Overrun_Pct"] = cost_over
-        df["Timeline_Overrun_Pct"] = time_over
-    else:
-        df["Predicted_Cost"] = models["cost_model"].predict(X)
-        df["Predicted_Timeline"] = models["timeline_model"].predict(X)
-
-    # Overall risk
-    def risk_row(row) -> str:
-        cost_over = abs(row.get("Cost_Overrun_Pct", np.nan))
-        time_over = abs(row.get("Timeline_Overrun_Pct", np.nan))
-        vals = [v for v in [cost_over, time_over] if np.isfinite(v)]
-        if not vals:
-            return "Unknown"
-        avg = float(np.mean(vals))
-        if avg < 10:
-            return "Low"
-        if avg < 30:
-            return "Medium"
-        return "High"
-
-    df["Overall_Risk"] = df.apply(risk_row, axis=1)
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    # Refuse before the body is read when the client declares its size
+    length = request.headers.get("content-length")
+    if request.url.path in ("/predict", "/scenarios", "/explain", "/aggregate", "/portfolio") and length and length.isdigit() and int(length) > PREDICT_MAX_UPLOAD_BYTES:
+        return JSONResponse({"detail": f"Upload exceeds {PREDICT_MAX_UPLOAD_MB} MB"}, status_code=413)
+    return await call_next(request)
+
+
+# Risk bands (mean absolute overrun %), overridable per deployment
+RISK_LOW = float(os.environ.get("RISK_LOW_THRESHOLD", LOW_RISK_THRESHOLD))
+RISK_HIGH = float(os.environ.get("RISK_HIGH_THRESHOLD", HIGH_RISK_THRESHOLD))
+
+# CSV parsing, inference and serialization run on this pool so the event loop
+# stays responsive. Requests beyond workers + queue are shed with a 503.
+PREDICT_WORKERS = int(os.environ.get("PREDICT_WORKERS", os.cpu_count() or 1))
+PREDICT_MAX_QUEUE = int(os.environ.get("PREDICT_MAX_QUEUE", 8))
+PREDICT_RETRY_AFTER = int(os.environ.get("PREDICT_RETRY_AFTER", 5))
+
+executor = ThreadPoolExecutor(max_workers=PREDICT_WORKERS, thread_name_prefix="predict")
+in_flight = 0
+
+# Upload limits. Starlette spools multipart bodies to a temp file (on disk past
+# 1 MB); we parse that file in row chunks instead of reading it into memory.
+PREDICT_MAX_UPLOAD_MB = float(os.environ.get("PREDICT_MAX_UPLOAD_MB", 200))
+PREDICT_MAX_UPLOAD_BYTES = int(PREDICT_MAX_UPLOAD_MB * 1024 * 1024)
+PREDICT_MAX_ROWS = int(os.environ.get("PREDICT_MAX_ROWS", 1_000_000))
+PREDICT_CHUNK_ROWS = int(os.environ.get("PREDICT_CHUNK_ROWS", 50_000))
+
+# Opt-in micro-batching: coalesce concurrent small uploads into one predict call
+PREDICT_MICROBATCH = os.environ.get("PREDICT_MICROBATCH", "0").lower() in ("1", "true", "yes")
+PREDICT_BATCH_MAX_SIZE = int(os.environ.get("PREDICT_BATCH_MAX_SIZE", 32))
+PREDICT_BATCH_MAX_WAIT_MS = float(os.environ.get("PREDICT_BATCH_MAX_WAIT_MS", 5))
+
+# Model artifact; loaded eagerly at startup and hot-reloadable without a restart
+MODELS_PATH = os.environ.get("MODELS_PATH", "best_models.pkl")
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 0))
+# Required by the admin endpoints; while unset they refuse every request
+RELOAD_TOKEN = os.environ.get("RELOAD_TOKEN")
+
+# Per-row cache of model outputs so re-uploads only score changed rows (0 disables)
+PREDICT_CACHE_ROWS = int(os.environ.get("PREDICT_CACHE_ROWS", 200_000))
+prediction_cache = PredictionCache(PREDICT_CACHE_ROWS) if PREDICT_CACHE_ROWS > 0 else None
+
+# Opt-in sampling profiler: unbatched /predict requests slower than this dump
+# their collapsed stacks to PREDICT_PROFILE_DIR (0 disables)
+PREDICT_PROFILE_SLOW_MS = float(os.environ.get("PREDICT_PROFILE_SLOW_MS", 0))
+PREDICT_PROFILE_DIR = os.environ.get("PREDICT_PROFILE_DIR", "profiles")
+PREDICT_PROFILE_INTERVAL_MS = float(os.environ.get("PREDICT_PROFILE_INTERVAL_MS", 5))
+
+# What-if sweeps on /scenarios: scenarios per request, rows per stacked predict call
+SCENARIO_MAX = int(os.environ.get("SCENARIO_MAX", 256))
+SCENARIO_BATCH_ROWS = int(os.environ.get("SCENARIO_BATCH_ROWS", 500_000))
+# /explain: rows explained per request (after high_only filtering); exact TreeSHAP costs ms per row
+EXPLAIN_MAX_ROWS = int(os.environ.get("EXPLAIN_MAX_ROWS", 10_000))
+# Dashboard aggregates cached per (upload digest or store generation, model version, parameters)
+AGGREGATE_CACHE_ENTRIES = int(os.environ.get("AGGREGATE_CACHE_ENTRIES", 64))
+aggregate_cache = ResultCache(AGGREGATE_CACHE_ENTRIES)
+
+# Input/prediction drift against the model's training baseline: counts decay by half every
+# DRIFT_HALF_LIFE_ROWS rows; larger requests are sketched on a DRIFT_SAMPLE_ROWS-row sample
+DRIFT_MONITOR = os.environ.get("DRIFT_MONITOR", "1").lower() in ("1", "true", "yes")
+DRIFT_HALF_LIFE_ROWS = float(os.environ.get("DRIFT_HALF_LIFE_ROWS", 50_000))
+DRIFT_SAMPLE_ROWS = int(os.environ.get("DRIFT_SAMPLE_ROWS", 10_000))
+DRIFT_MIN_ROWS = int(os.environ.get("DRIFT_MIN_ROWS", 500))
+drift_monitor: Optional[DriftMonitor] = None
+
+# Persistent store of scored projects (SQLite file; unset disables /portfolio)
+PORTFOLIO_DB = os.environ.get("PORTFOLIO_DB")
+PORTFOLIO_RESCORE_ROWS = int(os.environ.get("PORTFOLIO_RESCORE_ROWS", 50_000))
+portfolio = PortfolioStore(PORTFOLIO_DB, rescore_rows=PORTFOLIO_RESCORE_ROWS) if PORTFOLIO_DB else None
+
+bundle = None
+_models_lock = threading.Lock()
+_watch_task = None
+
+# Served in Prometheus text format on GET /metrics
+registry = Registry(prefix="powergrid_")
+STAGE_SECONDS = registry.histogram("predict_stage_seconds", "Seconds spent per /predict request stage", LATENCY_BUCKETS, ("stage",))
+# Nested inside a request's scoring, for every endpoint that scores rows through predict_df
+SCORE_STAGE_SECONDS = registry.histogram("score_stage_seconds", "Seconds spent per predict_df stage, by endpoint",
+                                         LATENCY_BUCKETS, ("endpoint", "stage"))
+REQUEST_SECONDS = registry.histogram("predict_request_seconds", "End-to-end /predict latency", LATENCY_BUCKETS)
+REQUEST_ROWS = registry.histogram("predict_rows", "Rows per /predict upload", [10, 100, 1_000, 10_000, 100_000, 1_000_000])
+UPLOAD_BYTES = registry.histogram("predict_upload_bytes", "Size of /predict uploads", [10 ** k for k in range(3, 10)])
+REQUESTS = registry.counter("predict_requests_total", "/predict requests by HTTP status", labelnames=("status",))
+registry.gauge("predict_in_flight", "/predict requests queued or running", fn=lambda: in_flight)
+registry.gauge("predict_capacity", "In-flight /predict requests allowed before shedding", fn=lambda: PREDICT_WORKERS + PREDICT_MAX_QUEUE)
+MODEL_LOADS = registry.counter("model_loads_total", "Model load attempts by outcome", labelnames=("outcome",))
+MODEL_INFO = registry.gauge("model_info", "Version of the loaded model artifact", labelnames=("version",))
+registry.gauge("model_load_seconds", "Seconds the current model took to load",
+               fn=lambda: bundle.load_seconds if bundle is not None else 0)
+registry.counter("aggregate_cache_hits_total", "Aggregate requests served from the cache", fn=lambda: aggregate_cache.hits)
+registry.counter("aggregate_cache_misses_total", "Aggregate requests computed", fn=lambda: aggregate_cache.misses)
+registry.gauge("drift_max_psi", "Largest per-column PSI of recent traffic against the training baseline",
+               fn=lambda: drift_monitor.max_psi() if drift_monitor is not None else 0.0)
+PROFILES_DUMPED = registry.counter("predict_profiles_dumped_total", "Slow-request profiles written")
+if prediction_cache is not None:
+    registry.counter("prediction_cache_hits_total", "Rows served from the prediction cache", fn=lambda: prediction_cache.hits)
+    registry.counter("prediction_cache_misses_total", "Rows scored by the models", fn=lambda: prediction_cache.misses)
+    registry.gauge("prediction_cache_rows", "Rows held in the prediction cache", fn=lambda: prediction_cache.stats()["rows"])
+if portfolio is not None:
+    registry.gauge("portfolio_projects", "Projects in the portfolio store", fn=portfolio.count)
+    registry.counter("portfolio_rescored_rows_total", "Stored projects rescored after a model change",
+                     fn=lambda: portfolio.rescored_rows)
+
+
+def load_models() -> ModelBundle:
+    global bundle
+    if bundle is None:
+        with _models_lock:
+            if bundle is None:
+                bundle = _load_bundle()
+    return bundle
+
+
+def _load_bundle() -> ModelBundle:
+    """ModelBundle.load(MODELS_PATH), counted and labeled in the metrics."""
+    global drift_monitor
+    try:
+        loaded = ModelBundle.load(MODELS_PATH)
+    except Exception:
+        MODEL_LOADS.labels("error").inc()
+        raise
+    MODEL_LOADS.labels("ok").inc()
+    MODEL_INFO.clear()
+    MODEL_INFO.labels(loaded.version).set(1)
+    if DRIFT_MONITOR:
+        # Drift is measured per model: a new bundle starts from empty live counts
+        drift_monitor = DriftMonitor(loaded.version, loaded.drift_baseline, DRIFT_HALF_LIFE_ROWS, DRIFT_SAMPLE_ROWS)
+    return loaded
+
+
+def reload_models() -> ModelBundle:
+    """Load MODELS_PATH into a new bundle and swap it in atomically."""
+    global bundle
+    with _models_lock:
+        fresh = _load_bundle()
+        # Requests already running keep the bundle they started with
+        bundle = fresh
+        if prediction_cache is not None:
+            # Keys already include the model version; clearing just frees the memory
+            prediction_cache.clear()
+    _rescore_portfolio()
+    return fresh
+
+
+def _score_for_store(df: pd.DataFrame, observe: bool = True):
+    current = load_models()
+    return predict_df(df, current, observe=observe, endpoint="portfolio" if observe else "rescore"), current.version
+
+
+def _rescore_portfolio() -> None:
+    """Rescore stored projects scored by an older model, in the background."""
+    if portfolio is not None:
+        # Rescoring replays stored inputs; they are not new traffic for the drift monitor
+        portfolio.start_rescore(lambda: load_models().version, lambda df: _score_for_store(df, observe=False))
+
+
+def _model_outputs(current: ModelBundle, features: pd.DataFrame, endpoint: str):
+    """(cost, timeline) model outputs per row; only rows missing from the cache are feature-engineered and scored."""
+    cost_key, time_key = current.model_keys
+    if prediction_cache is None:
+        with SCORE_STAGE_SECONDS.labels(endpoint, "features").time():
+            X = current.feature_engineer.transform(features)
+        with SCORE_STAGE_SECONDS.labels(endpoint, "predict").time():
+            return current.predict(cost_key, X), current.predict(time_key, X)
+
+    with SCORE_STAGE_SECONDS.labels(endpoint, "cache").time():
+        keys = prediction_cache.row_keys(features, current.version)
+        outputs, missing = prediction_cache.lookup(keys)
+    if len(missing):
+        with SCORE_STAGE_SECONDS.labels(endpoint, "features").time():
+            X = current.feature_engineer.transform(features if len(missing) == len(features) else features.iloc[missing])
+        with SCORE_STAGE_SECONDS.labels(endpoint, "predict").time():
+            outputs[missing, 0] = current.predict(cost_key, X)
+            outputs[missing, 1] = current.predict(time_key, X)
+        prediction_cache.store(keys[missing], outputs[missing])
+    return outputs[:, 0], outputs[:, 1]
+
+
+def predict_df(df: pd.DataFrame, current: Optional[ModelBundle] = None, observe: bool = True,
+               endpoint: str = "predict") -> pd.DataFrame:
+    current = current or load_models()
+    with SCORE_STAGE_SECONDS.labels(endpoint, "validate").time():
+        df, _ = validate_and_standardize(df, current.schema)
+
+    cost_out, time_out = _model_outputs(current, df.drop(columns=[c for c in ["TotalCost", "Timeline"] if c in df.columns]),
+                                        endpoint)
+
+    with SCORE_STAGE_SECONDS.labels(endpoint, "risk").time():
+        # Overrun models take precedence
+        if current.has_overrun_models:
+            cost_over = cost_out
+            time_over = time_out
+            cost_base = df["EstimatedCost"] if "EstimatedCost" in df.columns else df.get("TotalCost", pd.Series(0, index=df.index))
+            time_base = df["EstimatedTimeline"] if "EstimatedTimeline" in df.columns else df.get("Timeline", pd.Series(0, index=df.index))
+            df["Predicted_Cost"] = cost_base * (1.0 + cost_over / 100.0)
+            df["Predicted_Timeline"] = time_base * (1.0 + time_over / 100.0)
+            df["Cost_Overrun_Pct"] = cost_over
+            df["Timeline_Overrun_Pct"] = time_over
+        else:
+            df["Predicted_Cost"] = cost_out
+            df["Predicted_Timeline"] = time_out
+
+        df["Overall_Risk"] = assign_risk(df, low=RISK_LOW, high=RISK_HIGH)
+
+    monitor = drift_monitor
+    if observe and monitor is not None:
+        with SCORE_STAGE_SECONDS.labels(endpoint, "drift").time():
+            monitor.observe(current.version, df)
     return df
 
 
+batcher = MicroBatcher(
+    lambda df: predict_df(df), executor,
+    max_batch_size=PREDICT_BATCH_MAX_SIZE, max_wait=PREDICT_BATCH_MAX_WAIT_MS / 1000,
+) if PREDICT_MICROBATCH else None
+if batcher is not None:
+    registry.register("predict_batch_size", "Requests coalesced per micro-batch", batcher.batch_sizes)
+    registry.register("predict_batch_latency_seconds", "Micro-batch scoring latency", batcher.latency)
+
+
+def _read_upload(fh: BinaryIO) -> Iterator[pd.DataFrame]:
+    """
+    Yield the uploaded CSV, Parquet or Feather file (detected from its first
+    bytes) in row chunks straight from the spooled upload file, enforcing
+    PREDICT_MAX_ROWS as rows arrive. Columnar uploads are read projected
+    onto the model's schema.
+    """
+    n_rows = 0
+    fmt = sniff_format(fh)
+    try:
+        columns = projected_columns(fh, fmt, load_models().schema) if fmt != "csv" else None
+        for chunk in iter_chunks(fh, PREDICT_CHUNK_ROWS, columns=columns, dtype=csv_dtypes(), fmt=fmt):
+            n_rows += len(chunk)
+            if n_rows > PREDICT_MAX_ROWS:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds {PREDICT_MAX_ROWS} rows")
+            yield chunk
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Invalid {'CSV' if fmt == 'csv' else fmt.capitalize()} upload")
+
+
+def _parse_upload(fh: BinaryIO) -> pd.DataFrame:
+    chunks = list(_read_upload(fh))
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+
+
+def _render(out_df: pd.DataFrame, fmt: str, fields: Optional[str]) -> Response:
+    try:
+        return render(select_fields(out_df, fields), fmt)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _predict_upload(fh: BinaryIO, submitted: float, fmt: str = "json", fields: Optional[str] = None):
+    """Parse, score and serialize one upload on a worker thread; returns (response, timings)."""
+    if PREDICT_PROFILE_SLOW_MS <= 0:
+        return _score_upload(fh, submitted, fmt, fields)
+    started = time.perf_counter()
+    with StackSampler(PREDICT_PROFILE_INTERVAL_MS / 1000) as sampler:
+        result = _score_upload(fh, submitted, fmt, fields)
+    elapsed = time.perf_counter() - started
+    if elapsed * 1000 >= PREDICT_PROFILE_SLOW_MS:
+        os.makedirs(PREDICT_PROFILE_DIR, exist_ok=True)
+        sampler.dump(profile_path(PREDICT_PROFILE_DIR, "predict", elapsed))
+        PROFILES_DUMPED.inc()
+    return result
+
+
+def _score_upload(fh: BinaryIO, submitted: float, fmt: str, fields: Optional[str]):
+    started = time.perf_counter()
+    scored, score = [], 0.0
+    # Each chunk is validated and scored as soon as it is parsed
+    for chunk in _read_upload(fh):
+        parsed = time.perf_counter()
+        try:
+            scored.append(predict_df(chunk))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        score += time.perf_counter() - parsed
+    out_df = scored[0] if len(scored) == 1 else pd.concat(scored, ignore_index=True)
+    REQUEST_ROWS.observe(len(out_df))
+    rendering = time.perf_counter()
+    response = _render(out_df, fmt, fields)
+    done = time.perf_counter()
+    # parse is everything before rendering that wasn't scoring (CSV parsing and concatenation)
+    return response, {"queue": started - submitted, "parse": rendering - started - score, "score": score,
+                      "render": done - rendering}
+
+
+async def _predict_batched(fh: BinaryIO, submitted: float, fmt: str = "json", fields: Optional[str] = None):
+    """Parse and serialize per request, but score through the shared micro-batcher."""
+    loop = asyncio.get_running_loop()
+    df = await loop.run_in_executor(executor, _parse_upload, fh)
+    parsed = time.perf_counter()
+    REQUEST_ROWS.observe(len(df))
+    try:
+        out_df = await batcher.submit(df)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    scored = time.perf_counter()
+    response = await loop.run_in_executor(executor, _render, out_df, fmt, fields)
+    return response, {"parse": parsed - submitted, "batch": scored - parsed, "render": time.perf_counter() - scored}
+
+
 @app.post("/predict")
-async def predict(file: UploadFile = File(...)):
+async def predict(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="json (rows, default) | columns | csv | arrow | parquet | feather; overrides Accept"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns or globs, e.g. ProjectID,Predicted_*,Overall_Risk"),
+    accept: Optional[str] = Header(None),
+):
     try:
-        content = await file.read()
-        df = pd.read_csv(pd.io.common.BytesIO(content))
+        response = await _serve_predict(file, format, fields, accept)
+    except HTTPException as e:
+        REQUESTS.labels(e.status_code).inc()
+        raise
     except Exception:
-        raise HTTPException(status_code=400, detail="Invalid CSV upload")
+        REQUESTS.labels(500).inc()
+        raise
+    REQUESTS.labels(response.status_code).inc()
+    return response
+
+
+def _check_capacity() -> None:
+    if in_flight >= PREDICT_WORKERS + PREDICT_MAX_QUEUE:
+        raise HTTPException(
+            status_code=503,
+            detail="Prediction queue is full, retry later",
+            headers={"Retry-After": str(PREDICT_RETRY_AFTER)},
+        )
+
+
+async def _serve_predict(file: UploadFile, format: Optional[str], fields: Optional[str], accept: Optional[str]):
+    global in_flight
+    fmt = negotiate_format(format, accept)
+    _check_capacity()
+
+    if file.size is not None:
+        UPLOAD_BYTES.observe(file.size)
+        if file.size > PREDICT_MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds {PREDICT_MAX_UPLOAD_MB} MB")
+
+    in_flight += 1
+    try:
+        # Read the spooled upload file directly instead of buffering it all with file.read()
+        submitted = time.perf_counter()
+        if batcher is not None:
+            response, timings = await _predict_batched(file.file, submitted, fmt, fields)
+        else:
+            response, timings = await asyncio.get_running_loop().run_in_executor(
+                executor, _predict_upload, file.file, submitted, fmt, fields)
+    finally:
+        in_flight -= 1
+
+    REQUEST_SECONDS.observe(time.perf_counter() - submitted)
+    for name, secs in timings.items():
+        STAGE_SECONDS.labels(name).observe(secs)
+    # Queue wait and compute time, visible in browser devtools and access logs
+    response.headers["Server-Timing"] = ", ".join(f"{name};dur={secs * 1000:.1f}" for name, secs in timings.items())
+    return response
+
+
+def _run_sweep(fh: BinaryIO, sweep: list) -> dict:
+    df = _parse_upload(fh)
+    try:
+        return run_sweep(load_models(), df, sweep, RISK_LOW, RISK_HIGH, batch_rows=SCENARIO_BATCH_ROWS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/scenarios")
+async def scenarios(
+    file: UploadFile = File(...),
+    sweep: str = Form(..., description='JSON sweep spec: {"presets": [...], "scenarios": [...], "grid": {...}}'),
+):
+    """Overall_Risk distribution of the uploaded portfolio under each what-if scenario, versus as uploaded."""
+    global in_flight
+    try:
+        parsed = parse_sweep(json.loads(sweep))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sweep: {e}")
+    if len(parsed) > SCENARIO_MAX:
+        raise HTTPException(status_code=400, detail=f"Sweep has {len(parsed)} scenarios; the limit is {SCENARIO_MAX}")
+    _check_capacity()
 
+    in_flight += 1
     try:
-        out_df = predict_df(df)
+        return await asyncio.get_running_loop().run_in_executor(executor, _run_sweep, file.file, parsed)
+    finally:
+        in_flight -= 1
+
+
+def _explain_upload(fh: BinaryIO, top_k: int, high_only: bool, approx: bool, fmt: str, fields: Optional[str]) -> Response:
+    # One bundle for both, so a reload in between can't explain predictions another model made
+    current = load_models()
+    df = _parse_upload(fh)
+    try:
+        scored = predict_df(df, current, endpoint="explain")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    n_rows = int((scored["Overall_Risk"] == "High").sum()) if high_only else len(scored)
+    if n_rows > EXPLAIN_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"{n_rows} rows to explain exceeds {EXPLAIN_MAX_ROWS}; "
+                                                    "pass high_only=true or use predict.py --explain")
+    return _render(explain_frame(current, scored, top_k=top_k, high_only=high_only, approx=approx), fmt, fields)
+
+
+@app.post("/explain")
+async def explain(
+    file: UploadFile = File(...),
+    top_k: int = Query(DEFAULT_TOP_K, ge=1, description="Contributions reported per project and model"),
+    high_only: bool = Query(False, description="Explain only projects whose Overall_Risk is High"),
+    approx: bool = Query(False, description="Saabas attributions instead of exact TreeSHAP (much faster)"),
+    format: Optional[str] = Query(None, description="json (rows, default) | columns | csv | arrow | parquet | feather; overrides Accept"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns or globs"),
+    accept: Optional[str] = Header(None),
+):
+    """Top-k feature contributions per project for both overrun models, one-hot dummies folded into their source column."""
+    global in_flight
+    fmt = negotiate_format(format, accept)
+    _check_capacity()
+
+    in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, _explain_upload, file.file, top_k, high_only, approx, fmt, fields)
+    finally:
+        in_flight -= 1
+
+
+AggregateParams = Tuple[Tuple[str, ...], Tuple[float, ...], int]
+
+
+def _aggregate_params(
+    by: Optional[str] = Query(None, description=f"Comma-separated columns to group by (default {','.join(DIMENSIONS)})"),
+    percentiles: Optional[str] = Query(None, description="Comma-separated overrun percentiles per group, e.g. 50,90"),
+    top_n: int = Query(DEFAULT_TOP_N, ge=0, le=1_000, description="Worst projects listed, by mean |overrun|"),
+) -> AggregateParams:
+    try:
+        levels = tuple(float(p) for p in _split(percentiles)) if percentiles is not None else DEFAULT_PERCENTILES
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid percentiles {percentiles!r}")
+    if any(not 0 <= p <= 100 for p in levels):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    return tuple(_split(by)) if by is not None else tuple(DIMENSIONS), levels, top_n
+
+
+def _cached_aggregate(key: tuple, scored_fn, version: str, params: AggregateParams) -> JSONResponse:
+    """The cached aggregates under ``key``, else aggregate(scored_fn()) stored under it. X-Cache says which."""
+    result = aggregate_cache.get(key)
+    hit = result is not None
+    if not hit:
+        try:
+            result = {"model_version": version, **aggregate(scored_fn(), *params)}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        aggregate_cache.put(key, result)
+    return JSONResponse(result, headers={"X-Cache": "hit" if hit else "miss"})
+
+
+def _upload_digest(fh: BinaryIO) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for block in iter(lambda: fh.read(1 << 20), b""):
+        digest.update(block)
+    fh.seek(0)
+    return digest.hexdigest()
+
+
+def _aggregate_upload(fh: BinaryIO, params: AggregateParams) -> JSONResponse:
+    current = load_models()
+
+    def scored():
+        chunks = []
+        for chunk in _read_upload(fh):
+            try:
+                chunks.append(predict_df(chunk, current, endpoint="aggregate"))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=str(e))
+        return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+
+    return _cached_aggregate(("upload", _upload_digest(fh), current.version, params), scored, current.version, params)
+
+
+@app.post("/aggregate")
+async def aggregate_upload(file: UploadFile = File(...), params: AggregateParams = Depends(_aggregate_params)):
+    """
+    Dashboard aggregates of the scored upload: risk counts, summary means,
+    per-group counts, means and overrun percentiles, and the worst projects.
+    Re-posting the same file under the same model is served from the cache.
+    """
+    global in_flight
+    _check_capacity()
+
+    in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, _aggregate_upload, file.file, params)
+    finally:
+        in_flight -= 1
+
+
+def _require_portfolio() -> PortfolioStore:
+    if portfolio is None:
+        raise HTTPException(status_code=404, detail="Portfolio store is disabled; set PORTFOLIO_DB")
+    return portfolio
+
+
+def _upsert_upload(fh: BinaryIO) -> dict:
+    current = load_models()
+    df = _parse_upload(fh)
+    try:
+        df, warnings = validate_and_standardize(df, current.schema)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        result = portfolio.upsert(df, current.version, _score_for_store)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {**result, "model_version": current.version, "warnings": warnings}
+
+
+@app.post("/portfolio")
+async def upsert_portfolio(file: UploadFile = File(...)):
+    """Add or update projects by ProjectID; only new or changed projects are scored."""
+    global in_flight
+    _require_portfolio()
+    _check_capacity()
+
+    in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, _upsert_upload, file.file)
+    finally:
+        in_flight -= 1
 
-    # Return JSON rows
+
+def _split(values: Optional[str]) -> list:
+    return [v.strip() for v in values.split(",") if v.strip()] if values else []
+
+
+def _portfolio_filters(
+    risk: Optional[str] = Query(None, description="Overall_Risk values, comma-separated, e.g. High,Medium"),
+    project_type: Optional[str] = Query(None),
+    terrain: Optional[str] = Query(None),
+    weather_impact: Optional[str] = Query(None),
+    demand_supply: Optional[str] = Query(None),
+    state: Optional[str] = Query(None),
+    vendor: Optional[str] = Query(None),
+    project_id: Optional[str] = Query(None),
+) -> Dict[str, List[str]]:
+    given = dict(zip(FILTER_COLUMNS, [project_type, terrain, weather_impact, demand_supply, state, vendor]))
+    return {col: _split(values) for col, values in {**given, "Overall_Risk": risk, "ProjectID": project_id}.items()}
+
+
+@app.get("/portfolio")
+async def query_portfolio(
+    filters: Dict[str, List[str]] = Depends(_portfolio_filters),
+    sort: str = Query("ProjectID", description="Column to sort by; prefix with - for descending, e.g. -Cost_Overrun_Pct"),
+    limit: int = Query(100, ge=1, le=10_000),
+    offset: int = Query(0, ge=0),
+    format: Optional[str] = Query(None, description="json (rows, default) | columns | csv | arrow | parquet | feather; overrides Accept"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns or globs"),
+    accept: Optional[str] = Header(None),
+):
+    """One page of stored projects; filters take comma-separated values. The match count is in X-Total-Count."""
+    store = _require_portfolio()
+    fmt = negotiate_format(format, accept)
+
+    def run():
+        try:
+            page, total = store.query(filters, sort=sort, limit=limit, offset=offset)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        response = _render(page, fmt, fields)
+        response.headers["X-Total-Count"] = str(total)
+        return response
+
+    return await asyncio.get_running_loop().run_in_executor(executor, run)
+
+
+@app.get("/portfolio/stats")
+async def portfolio_stats():
+    store = _require_portfolio()
+    return await asyncio.get_running_loop().run_in_executor(executor, store.stats, load_models().version)
+
+
+@app.get("/portfolio/aggregate")
+async def aggregate_portfolio(filters: Dict[str, List[str]] = Depends(_portfolio_filters),
+                              params: AggregateParams = Depends(_aggregate_params)):
+    """Dashboard aggregates (as POST /aggregate) of the stored projects matching the filters; cached until the next write."""
+    store = _require_portfolio()
+    version = load_models().version
+    # Rows still awaiting a background rescore keep their previous outputs until it reaches them
+    key = ("portfolio", store.generation, version, tuple((col, tuple(v)) for col, v in filters.items()), params)
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, _cached_aggregate, key, lambda: store.scored_frame(filters), version, params)
+
+
+@app.get("/drift")
+async def drift():
+    """
+    Drift of recent inputs and predicted overruns against the loaded model's
+    training baseline: PSI and status per column, most drifted first.
+    """
+    if drift_monitor is None:
+        return {"enabled": False}
+    return {"enabled": True, **drift_monitor.report(DRIFT_MIN_ROWS)}
+
+
+@app.post("/drift/reset")
+async def reset_drift(x_reload_token: str = Header(None)):
+    """Drop the live counts, e.g. after a known change in the upload mix."""
+    _check_reload_token(x_reload_token)
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring is disabled")
+    drift_monitor.reset()
+    return {"reset": True, "model_version": drift_monitor.version}
+
+
+@app.get("/metrics")
+async def metrics():
+    return Response(registry.exposition(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/stats/batching")
+async def batching_stats():
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+
+@app.get("/health")
+async def health():
     return {
-        "rows": out_df.to_dict(orient="records")
+        "status": "ok",
+        "in_flight": in_flight,
+        "workers": PREDICT_WORKERS,
+        "max_queue": PREDICT_MAX_QUEUE,
     }
 
 
+@app.get("/stats/cache")
+async def cache_stats():
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+
+@app.get("/ready")
+async def ready():
+    if bundle is None:
+        return JSONResponse({"ready": False}, status_code=503)
+    return {"ready": True, "model": bundle.info()}
+
+
+def _check_reload_token(token: Optional[str]) -> None:
+    if not RELOAD_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set RELOAD_TOKEN")
+    if token is None or not hmac.compare_digest(token.encode(), RELOAD_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid reload token")
+
+
+@app.post("/admin/reload")
+async def reload(x_reload_token: str = Header(None)):
+    _check_reload_token(x_reload_token)
+    previous = bundle.version if bundle is not None else None
+    try:
+        fresh = await asyncio.get_running_loop().run_in_executor(executor, reload_models)
+    except Exception as e:
+        # Keep serving the old models
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {e}")
+    return {"previous_version": previous, "model": fresh.info()}
+
+
+async def _watch_models():
+    """Poll MODELS_PATH and hot-reload when it changes on disk."""
+    loop = asyncio.get_running_loop()
+    failed_key = None
+    while True:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL)
+        try:
+            stat = os.stat(MODELS_PATH)
+        except OSError:
+            continue
+        key = (stat.st_mtime_ns, stat.st_size)
+        if bundle is None or key in (bundle.stat_key, failed_key):
+            continue
+        try:
+            await loop.run_in_executor(executor, reload_models)
+        except Exception as e:
+            # Likely a half-written file; retried once it changes again
+            failed_key = key
+            print(f"Model reload from {MODELS_PATH} failed: {e}")
+
+
+@app.on_event("startup")
+async def warm_models():
+    global _watch_task
+    # Load before serving so the first request doesn't pay for the unpickle
+    await asyncio.get_running_loop().run_in_executor(executor, load_models)
+    # Projects stored under a model replaced while the API was down
+    _rescore_portfolio()
+    if MODEL_WATCH_INTERVAL > 0:
+        _watch_task = asyncio.create_task(_watch_models())
+
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    if _watch_task is not None:
+        _watch_task.cancel()
+    if batcher is not None:
+        await batcher.stop()
+    executor.shutdown(wait=False, cancel_futures=True)
+    if portfolio is not None:
+        portfolio.close()
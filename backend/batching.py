@@ -0,0 +1,120 @@
+"""
+Micro-batching for /predict: coalesce many small concurrent requests into one
+feature-engineering + predict call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Callable, List
+
+import pandas as pd
+
+from metrics import Histogram
+
+
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128]
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+def _score_group(score_fn: Callable[[pd.DataFrame], pd.DataFrame], frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    combined = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    scored = score_fn(combined)
+    out, start = [], 0
+    for frame in frames:
+        out.append(scored.iloc[start:start + len(frame)].reset_index(drop=True))
+        start += len(frame)
+    return out
+
+
+class MicroBatcher:
+    """
+    Collect frames submitted concurrently over a short window and score them together.
+
+    A batch closes after ``max_wait`` seconds or ``max_batch_size`` requests.
+    Frames with identical columns are concatenated and scored with one
+    ``score_fn`` call on ``executor``; each caller gets its own slice back.
+    Frames with different columns are scored separately, so per-request
+    fallbacks (e.g. missing EstimatedCost) behave exactly as unbatched.
+    """
+
+    def __init__(self, score_fn: Callable[[pd.DataFrame], pd.DataFrame], executor: Executor,
+                 max_batch_size: int = 32, max_wait: float = 0.005):
+        self.score_fn = score_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self._queue: asyncio.Queue | None = None
+        self._collector: asyncio.Task | None = None
+        self._dispatches: set = set()
+
+    async def submit(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._collector is None:
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        t0 = time.perf_counter()
+        await self._queue.put((df, future))
+        try:
+            return await future
+        finally:
+            self.latency.observe(time.perf_counter() - t0)
+
+    async def stop(self) -> None:
+        if self._collector is not None:
+            self._collector.cancel()
+            self._collector = None
+        for task in list(self._dispatches):
+            task.cancel()
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batch_sizes.observe(len(batch))
+            # Score while the next batch is being collected
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch) -> None:
+        groups = {}
+        for df, future in batch:
+            groups.setdefault(tuple(df.columns), []).append((df, future))
+        await asyncio.gather(*(self._score_items(items) for items in groups.values()))
+
+    async def _score_items(self, items) -> None:
+        frames = [df for df, _ in items]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, _score_group, self.score_fn, frames)
+        except Exception as e:
+            if len(items) > 1:
+                # Re-score one by one so only the offending request sees the error
+                await asyncio.gather(*(self._score_items([item]) for item in items))
+            elif not items[0][1].done():
+                items[0][1].set_exception(e)
+            return
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batch_size": self.batch_sizes.snapshot(),
+            "latency_seconds": self.latency.snapshot(),
+        }
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the prediction pipeline, stage by stage.
+
+Each (mode, source, rows) case runs in a fresh process so its peak RSS is
+its own. Modes:
+
+  cli         read_csv / validate / features / predict / risk / write, the
+              stages of predict.score_frame timed one by one
+  cli_stream  predict.stream_predictions end to end (the --chunksize path)
+  api         POST /predict through an in-process TestClient; stages come
+              from the Server-Timing header
+
+Inputs come from the tiled test_csvs variants and/or generate_data.py, as
+CSV and optionally Parquet/Feather (read and written in the same format).
+Run from backend/ and keep the JSON to compare against later commits:
+
+    python -m benchmarks.bench_pipeline --sizes 10 1000 100000 --output bench.json
+    python -m benchmarks.bench_pipeline --sizes 10 1000 100000 --compare bench.json
+    python -m benchmarks.bench_pipeline --sizes 100000 --formats csv parquet feather
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_workers import build_input as build_variants_input
+from data_io import FORMATS, projected_columns, read_table, table_format, write_table
+
+
+MODES = ["cli", "cli_stream", "api"]
+SOURCES = ["variants", "synthetic"]
+
+
+def build_synthetic_input(path: str, n_rows: int, seed: int = 0) -> None:
+    from generate_data import generate_rows
+    generate_rows(n_rows, np.random.default_rng(seed), labels=False).to_csv(path, index=False)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _timed(stages: dict, name: str, fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    stages[name] = time.perf_counter() - t0
+    return result
+
+
+def _cli_once(input_path: str, bundle) -> dict:
+    from risk import assign_risk
+    from schema import csv_dtypes, validate_and_standardize
+
+    stages = {}
+    fmt = table_format(input_path)
+    df = _timed(stages, "read", lambda: read_table(input_path, columns=projected_columns(input_path, fmt, bundle.schema),
+                                                   dtype=csv_dtypes(bundle.schema), fmt=fmt))
+    df, _ = _timed(stages, "validate", validate_and_standardize, df, bundle.schema)
+    features = df.drop(columns=[c for c in ["TotalCost", "Timeline"] if c in df.columns])
+    X = _timed(stages, "features", bundle.feature_engineer.transform, features)
+
+    cost_key, time_key = bundle.model_keys
+    cost_out, time_out = _timed(stages, "predict", lambda: (bundle.predict(cost_key, X), bundle.predict(time_key, X)))
+
+    def risk():
+        if bundle.has_overrun_models:
+            df["Predicted_Cost"] = df["EstimatedCost"] * (1.0 + cost_out / 100.0)
+            df["Predicted_Timeline"] = df["EstimatedTimeline"] * (1.0 + time_out / 100.0)
+            df["Cost_Overrun_Pct"] = cost_out
+            df["Timeline_Overrun_Pct"] = time_out
+        else:
+            df["Predicted_Cost"] = cost_out
+            df["Predicted_Timeline"] = time_out
+        df["Overall_Risk"] = assign_risk(df)
+    _timed(stages, "risk", risk)
+    _timed(stages, "write", write_table, df, io.StringIO() if fmt == "csv" else io.BytesIO(), fmt)
+    return stages
+
+
+def _cli_stream_once(input_path: str, models_path: str, chunksize: int) -> dict:
+    from predict import stream_predictions
+
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(input_path)[1]) as out:
+        stages = {}
+        _timed(stages, "stream", stream_predictions, input_path, out.name, models_path, chunksize)
+    return stages
+
+
+def _api_once(client, payload: bytes) -> dict:
+    t0 = time.perf_counter()
+    response = client.post("/predict", files={"file": ("bench", payload, "application/octet-stream")})
+    elapsed = time.perf_counter() - t0
+    response.raise_for_status()
+    stages = {}
+    for part in response.headers.get("Server-Timing", "").split(","):
+        name, _, dur = part.strip().partition(";dur=")
+        if dur:
+            stages[name] = float(dur) / 1000
+    stages["client_overhead"] = max(0.0, elapsed - sum(stages.values()))
+    return stages
+
+
+def run_case(mode: str, input_path: str, n_rows: int, models_path: str, repeat: int, chunksize: int) -> dict:
+    """Runs in a fresh process: load once, then time ``repeat`` passes and report medians."""
+    rss_start = peak_rss_mb()
+    if mode == "api":
+        # Before importing api: no cache (repeats would only measure hits) and no upload limits
+        os.environ.update(MODELS_PATH=models_path, PREDICT_CACHE_ROWS="0",
+                          PREDICT_MAX_ROWS=str(max(n_rows, 1)), PREDICT_MAX_UPLOAD_MB="100000")
+        from fastapi.testclient import TestClient
+        import api
+
+        with open(input_path, "rb") as fh:
+            payload = fh.read()
+        with TestClient(api.app) as client:
+            rss_loaded = peak_rss_mb()
+            runs = [_api_once(client, payload) for _ in range(repeat)]
+    elif mode == "cli":
+        from model_bundle import ModelBundle
+
+        bundle = ModelBundle.load(models_path)
+        rss_loaded = peak_rss_mb()
+        runs = [_cli_once(input_path, bundle) for _ in range(repeat)]
+    else:
+        rss_loaded = peak_rss_mb()
+        runs = [_cli_stream_once(input_path, models_path, chunksize) for _ in range(repeat)]
+
+    stages = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+    total = statistics.median(sum(run.values()) for run in runs)
+    return {
+        "stages": stages,
+        "total_s": total,
+        "rows_per_s": n_rows / total if total else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_over_loaded_mb": peak_rss_mb() - rss_loaded,
+        "startup_rss_mb": rss_start,
+    }
+
+
+def metadata() -> dict:
+    import xgboost
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "xgboost": xgboost.__version__,
+        "cpu_count": os.cpu_count(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> int:
+    """Print rows/s against a previous run; returns the number of regressions beyond ``tolerance``."""
+    with open(baseline_path) as fh:
+        # Results from before --formats are CSV
+        baseline = {(r["mode"], r["source"], r.get("format", "csv"), r["rows"]): r for r in json.load(fh)["results"]}
+    print(f"\nvs {baseline_path}")
+    print(f"{'mode':<11} {'source':<10} {'format':<8} {'rows':>8} {'old rows/s':>12} {'new rows/s':>12} {'change':>8}")
+    regressions = 0
+    for r in results:
+        old = baseline.get((r["mode"], r["source"], r["format"], r["rows"]))
+        if not old or not old["rows_per_s"] or not r["rows_per_s"]:
+            continue
+        change = r["rows_per_s"] / old["rows_per_s"] - 1
+        flag = ""
+        if change < -tolerance:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{r['mode']:<11} {r['source']:<10} {r['format']:<8} {r['rows']:>8} {old['rows_per_s']:>12.0f} "
+              f"{r['rows_per_s']:>12.0f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stage-level benchmark of the CLI and API prediction paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--sources", nargs="+", choices=SOURCES, default=SOURCES)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=["csv"], help="Input (and CLI output) file formats")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per case (medians are reported)")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="cli_stream chunk size")
+    parser.add_argument("--models", default="best_models.pkl")
+    parser.add_argument("--output", default=None, help="Write results as JSON here")
+    parser.add_argument("--compare", default=None, help="Previous --output JSON to compare rows/s against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Slowdown flagged as a regression by --compare")
+    args = parser.parse_args(argv)
+
+    models_path = os.path.abspath(args.models)
+    builders = {"variants": build_variants_input, "synthetic": build_synthetic_input}
+    results = []
+    print(f"{'mode':<11} {'source':<10} {'format':<8} {'rows':>8} {'total s':>9} {'rows/s':>10} {'peak MB':>8}  stages (s)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for source in args.sources:
+            for n_rows in args.sizes:
+                csv_path = os.path.join(tmp, f"{source}_{n_rows}.csv")
+                builders[source](csv_path, n_rows)
+                for fmt in args.formats:
+                    input_path = os.path.join(tmp, f"{source}_{n_rows}.{fmt}")
+                    if fmt != "csv":
+                        write_table(read_table(csv_path), input_path, fmt)
+                    for mode in args.modes:
+                        # A fresh process per case keeps peak RSS attributable
+                        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                            case = pool.submit(run_case, mode, input_path, n_rows, models_path,
+                                               args.repeat, args.chunksize).result()
+                        case = {"mode": mode, "source": source, "format": fmt, "rows": n_rows,
+                                "repeat": args.repeat, **case}
+                        results.append(case)
+                        stages = " ".join(f"{k}={v:.4f}" for k, v in case["stages"].items())
+                        print(f"{mode:<11} {source:<10} {fmt:<8} {n_rows:>8} {case['total_s']:>9.4f} "
+                              f"{case['rows_per_s']:>10.0f} {case['peak_rss_mb']:>8.0f}  {stages}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"meta": metadata(), "results": results}, fh, indent=2)
+        print(f"Wrote {args.output}")
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
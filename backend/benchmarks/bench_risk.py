@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark vectorized risk banding (risk.assign_risk) against the old
+row-wise DataFrame.apply(risk_row, axis=1) path.
+
+Run from backend/:  python -m benchmarks.bench_risk --sizes 1000 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from risk import assign_risk
+
+
+def risk_row(row) -> str:
+    # Reference copy of the closure previously inlined in api.py / predict.py
+    cost_over = abs(row.get("Cost_Overrun_Pct", np.nan))
+    time_over = abs(row.get("Timeline_Overrun_Pct", np.nan))
+    vals = [v for v in [cost_over, time_over] if np.isfinite(v)]
+    if not vals:
+        return "Unknown"
+    avg = float(np.mean(vals))
+    if avg < 10:
+        return "Low"
+    if avg < 30:
+        return "Medium"
+    return "High"
+
+
+def make_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "ProjectID": [f"PG-{i:07d}" for i in range(n_rows)],
+        "Cost_Overrun_Pct": rng.normal(15, 20, n_rows),
+        "Timeline_Overrun_Pct": rng.normal(20, 25, n_rows),
+    })
+    # Sprinkle the edge cases that produce 'Unknown' or single-sided averages
+    for col in ["Cost_Overrun_Pct", "Timeline_Overrun_Pct"]:
+        idx = rng.choice(n_rows, size=max(1, n_rows // 50), replace=False)
+        df.loc[idx, col] = rng.choice([np.nan, np.inf, -np.inf], size=len(idx))
+    return df
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark risk banding: vectorized vs DataFrame.apply")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>10} {'apply (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for n in args.sizes:
+        df = make_frame(n)
+        expected = df.apply(risk_row, axis=1)
+        got = assign_risk(df)
+        if not expected.equals(got.rename(None).astype(expected.dtype)):
+            raise SystemExit(f"Mismatch between apply and vectorized results at {n} rows")
+
+        t_apply = best_of(lambda: df.apply(risk_row, axis=1), args.repeat)
+        t_vec = best_of(lambda: assign_risk(df), args.repeat)
+        print(f"{n:>10} {t_apply:>12.4f} {t_vec:>15.5f} {t_apply / t_vec:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
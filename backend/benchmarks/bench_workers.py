@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Throughput of predict.py's streaming mode versus --workers.
+
+The bundled test_csvs variants are concatenated and tiled up to --rows,
+then scored with each worker count. Run from backend/:
+
+    python -m benchmarks.bench_workers --rows 500000 --workers 1 2 4 8
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from predict import stream_predictions
+
+
+TEST_CSV_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "test_csvs")
+
+
+def build_input(path: str, n_rows: int) -> None:
+    base = pd.concat([pd.read_csv(f) for f in sorted(glob.glob(os.path.join(TEST_CSV_DIR, "*.csv")))],
+                     ignore_index=True)
+    reps = -(-n_rows // len(base))
+    df = pd.concat([base] * reps, ignore_index=True).iloc[:n_rows]
+    df["ProjectID"] = [f"PG-{i:08d}" for i in range(len(df))]
+    df.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark predict.py throughput vs worker count")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunksize", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--models", default="best_models.pkl")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "input.csv")
+        build_input(input_path, args.rows)
+        print(f"Input: {args.rows} rows, chunksize {args.chunksize}, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'seconds':>9} {'rows/s':>10} {'speedup':>8}")
+
+        baseline = None
+        for workers in args.workers:
+            output_path = os.path.join(tmp, f"out_{workers}.csv")
+            t0 = time.perf_counter()
+            n_rows, _ = stream_predictions(input_path, output_path, args.models, args.chunksize, workers=workers)
+            elapsed = time.perf_counter() - t0
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {n_rows / elapsed:>10.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Readers and writers for tabular files (CSV, Parquet, Feather). Inputs can
+be read whole or in chunks, projected onto the columns a caller needs and,
+for the columnar formats, memory-mapped.
+"""
+
+from __future__ import annotations
+
+import glob
+import os
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+FEATHER_EXTENSIONS = (".feather", ".arrow")
+FORMATS = ("csv", "parquet", "feather")
+# Written as float32 to columnar files: model outputs carry no more precision than that
+PREDICTION_COLUMNS = ["Predicted_Cost", "Predicted_Timeline", "Cost_Overrun_Pct", "Timeline_Overrun_Pct"]
+
+Source = Union[str, BinaryIO]
+
+
+def table_format(path: str) -> str:
+    """csv, parquet or feather, from the file extension (anything unknown is CSV)."""
+    lower = path.lower()
+    if lower.endswith(PARQUET_EXTENSIONS):
+        return "parquet"
+    if lower.endswith(FEATHER_EXTENSIONS):
+        return "feather"
+    return "csv"
+
+
+def sniff_format(fh: BinaryIO) -> str:
+    """Detect the format of an open binary file from its magic bytes, leaving it rewound."""
+    head = fh.read(6)
+    fh.seek(0)
+    if head[:4] == b"PAR1":
+        return "parquet"
+    if head == b"ARROW1":
+        return "feather"
+    return "csv"
+
+
+def source_columns(source: Source, fmt: str) -> List[str]:
+    """Column names of a Parquet/Feather file without reading its data."""
+    if fmt == "parquet":
+        names = pq.ParquetFile(source).schema_arrow.names
+    else:
+        names = pa.ipc.open_file(source).schema.names
+    if not isinstance(source, str):
+        source.seek(0)
+    return names
+
+
+def projected_columns(source: Source, fmt: str, wanted) -> Optional[List[str]]:
+    """
+    The columns of a Parquet/Feather file that are in ``wanted``, in file
+    order, so only those are read. None (every column) for CSV, whose rows
+    are parsed whole anyway and echo unknown columns back.
+    """
+    if fmt == "csv":
+        return None
+    return [c for c in source_columns(source, fmt) if c in wanted]
+
+
+def _read_arrow(source: Source, fmt: str, columns: Optional[List[str]], categories: List[str]):
+    # Memory-map paths; file objects (uploads) are read as they are
+    memory_map = isinstance(source, str)
+    if fmt == "parquet":
+        return pq.read_table(source, columns=columns, memory_map=memory_map, read_dictionary=categories)
+    table = feather.read_table(source, columns=columns, memory_map=memory_map)
+    for name in categories:
+        i = table.schema.get_field_index(name)
+        if i >= 0 and not pa.types.is_dictionary(table.schema.field(i).type):
+            table = table.set_column(i, name, table.column(i).dictionary_encode())
+    return table
+
+
+def _categories(source: Source, fmt: str, columns: Optional[List[str]], dtype: Optional[Dict[str, str]]) -> List[str]:
+    # Columns read_csv would parse as category come back from Arrow as pandas Categoricals
+    wanted = columns if columns is not None else source_columns(source, fmt)
+    return [c for c in wanted if (dtype or {}).get(c) == "category"]
+
+
+def read_table(source: Source, columns: Optional[List[str]] = None, dtype: Optional[Dict[str, str]] = None,
+               fmt: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a whole CSV/Parquet/Feather file. ``columns`` projects the read;
+    ``dtype`` is read_csv's mapping, of which the columnar formats honour
+    "category" by dictionary-decoding straight into Categoricals.
+    """
+    fmt = fmt or table_format(source)
+    if fmt == "csv":
+        return pd.read_csv(source, usecols=columns, dtype=dtype)
+    return _read_arrow(source, fmt, columns, _categories(source, fmt, columns, dtype)).to_pandas()
+
+
+def expand_paths(patterns: Iterable[str]) -> List[str]:
+    """Expand files, directories (their *.csv / *.parquet / *.feather) and glob patterns into a sorted path list."""
+    paths: List[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for ext in (".csv",) + PARQUET_EXTENSIONS + FEATHER_EXTENSIONS:
+                paths.extend(glob.glob(os.path.join(pattern, f"*{ext}")))
+        elif any(ch in pattern for ch in "*?["):
+            paths.extend(glob.glob(pattern))
+        else:
+            paths.append(pattern)
+    return sorted(set(paths))
+
+
+def iter_chunks(source: Source, chunksize: int, columns: Optional[List[str]] = None,
+                dtype: Optional[Dict[str, str]] = None, fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Yield ``source`` as DataFrames of at most ``chunksize`` rows (``columns``/``dtype`` as for read_table)."""
+    fmt = fmt or table_format(source)
+    if fmt == "csv":
+        with pd.read_csv(source, chunksize=chunksize, usecols=columns, dtype=dtype) as reader:
+            yield from reader
+        return
+    categories = _categories(source, fmt, columns, dtype)
+    if fmt == "parquet":
+        batches = pq.ParquetFile(source, memory_map=isinstance(source, str), read_dictionary=categories).iter_batches(
+            batch_size=chunksize, columns=columns)
+    else:
+        batches = _read_arrow(source, fmt, columns, categories).to_batches(max_chunksize=chunksize)
+    for batch in batches:
+        yield batch.to_pandas()
+
+
+def iter_shards(paths: Iterable[str], chunksize: int, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    for path in paths:
+        yield from iter_chunks(path, chunksize, columns=columns)
+
+
+def compact_predictions(df: pd.DataFrame) -> pd.DataFrame:
+    narrow = {c: np.float32 for c in PREDICTION_COLUMNS if c in df.columns and df[c].dtype != np.float32}
+    return df.astype(narrow) if narrow else df
+
+
+class ColumnarWriter:
+    """
+    Append frames to one Parquet or Feather file. The first frame fixes the
+    Arrow schema; later frames are converted onto it.
+    """
+
+    def __init__(self, sink: Source, fmt: str):
+        self.sink = sink
+        self.fmt = fmt
+        self.schema = None
+        self._writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        df = compact_predictions(df)
+        if self._writer is None:
+            first = pa.Table.from_pandas(df, preserve_index=False)
+            # Each chunk has its own category dictionaries, so store the plain values
+            self.schema = pa.schema([pa.field(f.name, f.type.value_type if pa.types.is_dictionary(f.type) else f.type)
+                                     for f in first.schema])
+            if self.fmt == "parquet":
+                self._writer = pq.ParquetWriter(self.sink, self.schema)
+            else:
+                self._writer = pa.ipc.new_file(self.sink, self.schema,
+                                               options=pa.ipc.IpcWriteOptions(compression="lz4"))
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self.schema, preserve_index=False))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def write_table(df: pd.DataFrame, sink: Source, fmt: Optional[str] = None) -> None:
+    """Write ``df`` as CSV, or as Parquet/Feather with float32 predictions."""
+    fmt = fmt or table_format(sink)
+    if fmt == "csv":
+        df.to_csv(sink, index=False)
+        return
+    writer = ColumnarWriter(sink, fmt)
+    writer.write(df)
+    writer.close()
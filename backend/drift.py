@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Input and prediction drift: constant-memory sketches of what the model
+sees, compared against a baseline captured on its training data.
+
+A sketch keeps, per monitored column, counts over a fixed set of buckets:
+quantile bins of the training values (plus a missing bucket) for numeric
+inputs and predicted overruns, and the training vocabulary plus "unseen"
+and "missing" buckets for categoricals. Unseen labels are the ones the
+encoder maps to all-zero dummies, e.g. a new Vendor ID. Updating costs one
+``searchsorted``/``bincount`` per column, and the memory does not grow
+with traffic.
+
+Training scripts store the baseline in best_models.pkl under
+``drift_baseline``. The API keeps a live sketch whose counts decay with a
+half-life in rows, so the drift scores (PSI per column) follow recent
+traffic rather than everything since startup.
+
+Attach a baseline to an artifact trained before this existed:
+
+    python drift.py --models best_models.pkl --data training.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_BINS = 10
+MONITORED_OUTPUTS = ["Cost_Overrun_Pct", "Timeline_Overrun_Pct"]
+# Population stability index bands: below MODERATE is stable, above SIGNIFICANT has drifted
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+# Share floor so empty buckets don't make the PSI infinite
+_MIN_SHARE = 1e-4
+MAX_UNSEEN_LABELS = 20
+
+
+def _numeric(series: pd.Series) -> np.ndarray:
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors="coerce")
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _bin_names(edges: np.ndarray) -> List[str]:
+    if not len(edges):
+        return ["all", "missing"]
+    names = [f"< {edges[0]:g}"] + [f"[{lo:g}, {hi:g})" for lo, hi in zip(edges[:-1], edges[1:])] + [f">= {edges[-1]:g}"]
+    return names + ["missing"]
+
+
+def psi(live: np.ndarray, baseline: np.ndarray) -> float:
+    """Population stability index between two bucket count vectors."""
+    p = np.maximum(live / max(live.sum(), 1e-12), _MIN_SHARE)
+    q = np.maximum(baseline / max(baseline.sum(), 1e-12), _MIN_SHARE)
+    return float(np.sum((p - q) * np.log(p / q)))
+
+
+def psi_status(value: float) -> str:
+    if value >= PSI_SIGNIFICANT:
+        return "drift"
+    return "moderate" if value >= PSI_MODERATE else "stable"
+
+
+class DriftSketch:
+    """
+    Bucket counts per monitored column. ``half_life_rows`` > 0 decays the
+    existing counts by half for every that many rows observed; 0 keeps
+    plain totals (baselines). Thread-safe.
+    """
+
+    def __init__(self, edges: Dict[str, np.ndarray], labels: Dict[str, List[str]], half_life_rows: float = 0):
+        self.edges = {col: np.asarray(e, dtype=np.float64) for col, e in edges.items()}
+        self.labels = {col: list(v) for col, v in labels.items()}
+        self.half_life_rows = half_life_rows
+        self._label_index = {col: pd.Index(v) for col, v in self.labels.items()}
+        # Numerics: bins + missing; categoricals: labels + unseen + missing
+        self.counts = {col: np.zeros(len(e) + 2) for col, e in self.edges.items()}
+        self.counts.update({col: np.zeros(len(v) + 2) for col, v in self.labels.items()})
+        # Decayed (sum, sum of squares) of the finite numeric values
+        self.moments = {col: np.zeros(2) for col in self.edges}
+        # Rows whose frame carried the column at all; columns uploads never send aren't drift
+        self.present = {col: 0 for col in self.counts}
+        self.unseen: Dict[str, Dict[str, float]] = {col: {} for col in self.labels}
+        # (column, CategoricalDtype) -> label position of each category; uploads reuse a handful of dtypes
+        self._positions: Dict[tuple, np.ndarray] = {}
+        self.rows_seen = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def fit(cls, frame: pd.DataFrame, feature_engineer, bins: int = DEFAULT_BINS) -> "DriftSketch":
+        """
+        An empty sketch whose buckets come from ``frame``: quantile bin edges
+        of the model's raw numeric inputs and MONITORED_OUTPUTS, and the
+        encoder's vocabulary for each raw categorical.
+        """
+        edges = {}
+        for col in [c for c in feature_engineer.numeric_features if c in frame.columns] + \
+                   [c for c in MONITORED_OUTPUTS if c in frame.columns]:
+            values = _numeric(frame[col])
+            values = values[np.isfinite(values)]
+            edges[col] = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])) if len(values) else np.empty(0)
+        labels = {col: [v for v in values if v != "nan"]
+                  for col, values in feature_engineer.categories.items() if col in frame.columns}
+        return cls(edges, labels)
+
+    def empty(self, half_life_rows: float = 0) -> "DriftSketch":
+        """A sketch with the same buckets and no counts."""
+        return DriftSketch(self.edges, self.labels, half_life_rows)
+
+    # -- updates ------------------------------------------------------------
+
+    def _numeric_counts(self, col: str, series: pd.Series):
+        values = _numeric(series)
+        finite = values[np.isfinite(values)]
+        counts = np.bincount(np.searchsorted(self.edges[col], finite, side="right"),
+                             minlength=len(self.edges[col]) + 1).astype(np.float64)
+        return np.append(counts, len(values) - len(finite)), np.array([finite.sum(), np.square(finite).sum()])
+
+    def _category_counts(self, col: str, series: pd.Series):
+        """Counts over labels + unseen + missing, and {unseen label: count}."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Count codes, then fold the (few) categories onto the labels
+            codes = series.array.codes
+            categories = series.dtype.categories
+            key = (col, series.dtype)
+            position = self._positions.get(key)
+            if position is None:
+                if len(self._positions) > 64:
+                    self._positions.clear()
+                position = self._positions[key] = self._label_index[col].get_indexer(categories.astype(str))
+            per_category = np.bincount(codes[codes >= 0], minlength=len(position)).astype(np.float64)
+            missing = len(codes) - per_category.sum()
+        else:
+            observed = series.value_counts(dropna=True)
+            categories = observed.index
+            position = self._label_index[col].get_indexer(categories.astype(str))
+            per_category = observed.to_numpy(dtype=np.float64)
+            missing = len(series) - per_category.sum()
+        known = position >= 0
+        counts = np.bincount(position[known], weights=per_category[known], minlength=len(self.labels[col]))
+        unseen = {}
+        if not known.all():
+            unseen = {str(label): count for label, count in zip(categories[~known], per_category[~known]) if count > 0}
+        return np.append(counts, [sum(unseen.values()), missing]), unseen
+
+    def update(self, frame: pd.DataFrame, sample_rows: int = 0) -> None:
+        """
+        Add ``frame``'s rows; monitored columns it lacks count as missing.
+        With ``sample_rows``, larger frames are counted on an evenly strided
+        sample of about that many rows, scaled back up to ``len(frame)``.
+        """
+        n = len(frame)
+        if not n:
+            return
+        scale = 1.0
+        if 0 < sample_rows < n:
+            frame = frame.iloc[::-(-n // sample_rows)]
+            scale = n / len(frame)
+        numeric, categorical = {}, {}
+        for col in self.edges:
+            if col in frame.columns:
+                counts, moments = self._numeric_counts(col, frame[col])
+                numeric[col] = (counts * scale, moments * scale)
+        for col in self.labels:
+            if col in frame.columns:
+                counts, unseen = self._category_counts(col, frame[col])
+                categorical[col] = (counts * scale, {label: count * scale for label, count in unseen.items()})
+
+        with self._lock:
+            decay = 0.5 ** (n / self.half_life_rows) if self.half_life_rows > 0 else 1.0
+            for col, counts in self.counts.items():
+                counts *= decay
+                if col in numeric:
+                    counts += numeric[col][0]
+                elif col in categorical:
+                    counts += categorical[col][0]
+                else:
+                    counts[-1] += n
+            for col, moments in self.moments.items():
+                moments *= decay
+                if col in numeric:
+                    moments += numeric[col][1]
+            for col, (_, unseen) in categorical.items():
+                self._track_unseen(col, unseen, decay)
+            for col in self.present:
+                if col in frame.columns:
+                    self.present[col] += n
+            self.rows_seen += n
+
+    def _track_unseen(self, col: str, unseen: Dict[str, float], decay: float) -> None:
+        # Bounded: once full, a new label only displaces the rarest tracked one
+        tracked = self.unseen[col]
+        for label in tracked:
+            tracked[label] *= decay
+        for label, count in unseen.items():
+            if label in tracked or len(tracked) < MAX_UNSEEN_LABELS:
+                tracked[label] = tracked.get(label, 0.0) + float(count)
+            else:
+                rarest = min(tracked, key=tracked.get)
+                if count > tracked[rarest]:
+                    del tracked[rarest]
+                    tracked[label] = float(count)
+
+    # -- comparison ---------------------------------------------------------
+
+    def weight(self) -> float:
+        """Rows represented by the (decayed) counts."""
+        with self._lock:
+            return float(next(iter(self.counts.values())).sum()) if self.counts else 0.0
+
+    def _buckets(self, col: str) -> List[str]:
+        if col in self.edges:
+            return _bin_names(self.edges[col])
+        return self.labels[col] + ["unseen", "missing"]
+
+    def _column_stats(self, col: str, counts: np.ndarray) -> dict:
+        total = counts.sum()
+        share = counts / total if total else counts
+        stats = {"missing_share": float(share[-1])}
+        if col in self.edges:
+            finite = total - counts[-1]
+            s, s2 = self.moments[col]
+            mean = s / finite if finite else np.nan
+            stats["mean"] = float(mean) if finite else None
+            stats["std"] = float(np.sqrt(max(s2 / finite - mean * mean, 0.0))) if finite else None
+        else:
+            stats["unseen_share"] = float(share[-2])
+        return stats
+
+    def absent_columns(self) -> List[str]:
+        """Monitored columns that no observed frame carried, e.g. a training-only input."""
+        with self._lock:
+            return [col for col, rows in self.present.items() if not rows] if self.rows_seen else []
+
+    def compare(self, baseline: "DriftSketch", top: int = 3) -> List[dict]:
+        """
+        Per-column drift of this sketch against ``baseline`` (same buckets),
+        most drifted first: PSI, status, both sides' summary stats and the
+        buckets whose share moved most. Absent columns are left out.
+        """
+        absent = set(self.absent_columns())
+        with self._lock:
+            live_counts = {col: counts.copy() for col, counts in self.counts.items() if col not in absent}
+            unseen = {col: dict(labels) for col, labels in self.unseen.items()}
+        out = []
+        for col, live in live_counts.items():
+            base = baseline.counts[col]
+            value = psi(live, base)
+            shift = live / max(live.sum(), 1e-12) - base / max(base.sum(), 1e-12)
+            names = self._buckets(col)
+            moved = np.argsort(-np.abs(shift), kind="stable")[:top]
+            entry = {
+                "column": col,
+                "kind": "numeric" if col in self.edges else "categorical",
+                "output": col in MONITORED_OUTPUTS,
+                "psi": value,
+                "status": psi_status(value),
+                "live": self._column_stats(col, live),
+                "baseline": baseline._column_stats(col, base),
+                "largest_shifts": [{"bucket": names[i], "live_share": float(live[i] / max(live.sum(), 1e-12)),
+                                    "baseline_share": float(base[i] / max(base.sum(), 1e-12))}
+                                   for i in moved if shift[i] != 0],
+            }
+            if col in unseen and unseen[col]:
+                entry["unseen_labels"] = {label: round(count, 2) for label, count in
+                                          sorted(unseen[col].items(), key=lambda kv: -kv[1])}
+            out.append(entry)
+        return sorted(out, key=lambda e: -e["psi"])
+
+    # -- persistence --------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        """Plain lists and floats, so the artifact doesn't pickle this class."""
+        with self._lock:
+            return {
+                "edges": {col: e.tolist() for col, e in self.edges.items()},
+                "labels": {col: list(v) for col, v in self.labels.items()},
+                "counts": {col: c.tolist() for col, c in self.counts.items()},
+                "moments": {col: m.tolist() for col, m in self.moments.items()},
+                "rows": self.rows_seen,
+            }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "DriftSketch":
+        sketch = cls(state["edges"], state["labels"])
+        for col, counts in state["counts"].items():
+            sketch.counts[col] = np.asarray(counts, dtype=np.float64)
+        for col, moments in state["moments"].items():
+            sketch.moments[col] = np.asarray(moments, dtype=np.float64)
+        sketch.rows_seen = state["rows"]
+        return sketch
+
+
+def with_predictions(inputs: pd.DataFrame, models: dict, X: np.ndarray) -> pd.DataFrame:
+    """``inputs`` plus the artifact's overrun predictions on their encoding ``X``: one baseline chunk."""
+    from model_bundle import OVERRUN_MODEL_KEYS, booster_predict
+    return inputs.assign(**{col: booster_predict(models[key], X) for col, key in zip(MONITORED_OUTPUTS, OVERRUN_MODEL_KEYS)})
+
+
+def capture_baseline(chunks: Iterable[pd.DataFrame], feature_engineer, bins: int = DEFAULT_BINS) -> dict:
+    """
+    The ``drift_baseline`` entry for an artifact: training rows (raw inputs
+    plus the model's Cost_/Timeline_Overrun_Pct predictions), streamed in
+    chunks. Bucket edges come from the first chunk.
+    """
+    sketch = None
+    for chunk in chunks:
+        if sketch is None:
+            sketch = DriftSketch.fit(chunk, feature_engineer, bins)
+        sketch.update(chunk)
+    if sketch is None:
+        raise ValueError("No rows to capture a drift baseline from")
+    return sketch.to_dict()
+
+
+class DriftMonitor:
+    """Live traffic of one model version against that model's training baseline."""
+
+    def __init__(self, version: str, baseline: Optional[DriftSketch], half_life_rows: float = 0, sample_rows: int = 0):
+        self.version = version
+        self.baseline = baseline
+        self.half_life_rows = half_life_rows
+        self.sample_rows = sample_rows
+        self.live = baseline.empty(half_life_rows) if baseline is not None else None
+
+    def observe(self, version: str, frame: pd.DataFrame) -> None:
+        # Requests still finishing on a previous model don't count against this one
+        if self.live is not None and version == self.version:
+            self.live.update(frame, self.sample_rows)
+
+    def reset(self) -> None:
+        if self.baseline is not None:
+            self.live = self.baseline.empty(self.half_life_rows)
+
+    def max_psi(self) -> float:
+        if self.live is None or self.live.rows_seen == 0:
+            return 0.0
+        columns = self.live.compare(self.baseline, top=0)
+        return columns[0]["psi"] if columns else 0.0
+
+    def report(self, min_rows: float = 0) -> dict:
+        if self.live is None:
+            return {"model_version": self.version, "baseline": False,
+                    "detail": "Model artifact has no drift_baseline; attach one with "
+                              "`python drift.py --models best_models.pkl [--data training.csv]`"}
+        weight = self.live.weight()
+        columns = self.live.compare(self.baseline) if self.live.rows_seen else []
+        enough = weight >= min_rows and self.live.rows_seen > 0
+        worst = columns[0]["psi"] if columns else 0.0
+        return {
+            "model_version": self.version,
+            "baseline": True,
+            "baseline_rows": self.baseline.rows_seen,
+            "rows_seen": self.live.rows_seen,
+            "effective_rows": weight,
+            "half_life_rows": self.half_life_rows,
+            "status": psi_status(worst) if enough else "insufficient_data",
+            "max_psi": worst,
+            "drifted": [c["column"] for c in columns if c["status"] == "drift"],
+            "absent_columns": self.live.absent_columns(),
+            "columns": columns,
+        }
+
+
+def _baseline_chunks(models: dict, data: Optional[str], chunksize: int) -> Iterable[pd.DataFrame]:
+    from data_io import iter_chunks
+    from feature_engineering import get_feature_engineer
+    from retrain_incremental import NON_FEATURE_COLUMNS
+
+    fe = get_feature_engineer(models)
+    if data is None:
+        # What train_overrun.py fits on: the training split of create_sample_data()
+        from sklearn.model_selection import train_test_split
+        from train_overrun import create_sample_data
+        frame = create_sample_data()
+        train, _ = train_test_split(frame, test_size=0.2, random_state=42)
+        chunks = [train]
+    else:
+        chunks = iter_chunks(data, chunksize)
+    for chunk in chunks:
+        inputs = chunk.drop(columns=[c for c in NON_FEATURE_COLUMNS if c in chunk.columns])
+        yield with_predictions(inputs, models, fe.transform(inputs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture a drift baseline into a model artifact")
+    parser.add_argument("--models", default="best_models.pkl")
+    parser.add_argument("--data", default=None,
+                        help="Training data (CSV/Parquet/Feather); default: train_overrun.py's synthetic training split")
+    parser.add_argument("--output", default=None, help="Where to write the artifact (default: overwrite --models)")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS, help="Quantile bins per numeric column")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    import joblib
+    from feature_engineering import get_feature_engineer
+
+    models = joblib.load(args.models)
+    models["drift_baseline"] = capture_baseline(_baseline_chunks(models, args.data, args.chunksize),
+                                                get_feature_engineer(models), args.bins)
+    output = args.output or args.models
+    # Atomic replace, so a hot-reloading API never sees a partial file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output)), suffix=".pkl.tmp")
+    os.close(fd)
+    joblib.dump(models, tmp)
+    os.replace(tmp, output)
+    print(f"Saved {output} with a drift baseline of {models['drift_baseline']['rows']} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,15 @@
+import numpy as np
 import pandas as pd
 
-def apply_feature_engineering(df):
+# Define categorical features 
+# Added 'State' to handle potential location data like 'Maharashtra'
+CATEGORICAL_FEATURES = ['ProjectType', 'Terrain', 'WeatherImpact', 'DemandSupply', 'State', 'Vendor', 'Type_x_Terrain', 'Season', 'Season_x_Terrain']
+
+
+def add_derived_features(df):
     """
-    Apply feature engineering to the input DataFrame.
-    - One-hot encode categorical features
-    - Create domain signals (estimate deltas)
+    Add domain signals (estimate deltas, composites, interactions) to ``df`` in place.
     """
-    # Define categorical features 
-    # Added 'State' to handle potential location data like 'Maharashtra'
-    categorical_features = ['ProjectType', 'Terrain', 'WeatherImpact', 'DemandSupply', 'State', 'Vendor', 'Type_x_Terrain', 'Season', 'Season_x_Terrain']
-
     # Estimate deltas as features when estimated and raw exist
     if 'EstimatedCost' in df.columns and 'TotalCost' in df.columns:
         df['EstCost_to_TotalCost_Ratio'] = (df['EstimatedCost'] / df['TotalCost']).replace([float('inf'), -float('inf')], 0)
@@ -39,22 +39,129 @@ def apply_feature_engineering(df):
         df['Season'] = ((df['StartMonth'] % 12) // 3).map({0:'Q1',1:'Q2',2:'Q3',3:'Q4'})
         df['Season_x_Terrain'] = df['Season'].astype(str) + '|' + df['Terrain'].astype(str)
 
+    return df
+
+
+def apply_feature_engineering(df):
+    """
+    Apply feature engineering to the input DataFrame.
+    - One-hot encode categorical features
+    - Create domain signals (estimate deltas)
+    """
+    df = add_derived_features(df)
+
     # One-hot encode categorical features that exist in the dataframe
-    df_encoded = pd.get_dummies(df, columns=[col for col in categorical_features if col in df.columns], dummy_na=True)
+    df_encoded = pd.get_dummies(df, columns=[col for col in CATEGORICAL_FEATURES if col in df.columns], dummy_na=True)
 
     return df_encoded
 
+
 class FeatureEngineer:
     """
-    A simple FeatureEngineer class.
-    In a real-world scenario, this would be more complex,
-    handling feature scaling, encoding, and more.
+    Fitted encoder mapping raw project frames onto the model's feature layout.
+
+    ``fit`` learns the category vocabularies and the final column order from
+    the training frame. ``transform`` writes straight into a preallocated
+    float32 matrix in ``feature_names`` order, so categories unseen at train
+    time never materialise as throwaway dummy columns.
     """
     def __init__(self):
-        pass
+        self.feature_names = None
+        self.numeric_features = []
+        self.categories = {}
 
-    def fit_transform(self, df):
-        return apply_feature_engineering(df)
+    @classmethod
+    def from_feature_names(cls, feature_names):
+        """Rebuild an encoder from a saved ``feature_names`` layout (older pickles)."""
+        return cls()._set_layout(feature_names)
+
+    def _set_layout(self, feature_names):
+        self.feature_names = list(feature_names)
+        self.numeric_features = []
+        self.categories = {}
+        # Longest prefix first so 'Season_x_Terrain_Q1|Hills' is not read as 'Season'
+        prefixes = sorted(CATEGORICAL_FEATURES, key=len, reverse=True)
+        for name in self.feature_names:
+            col = next((c for c in prefixes if name.startswith(c + '_')), None)
+            if col is None:
+                self.numeric_features.append(name)
+            else:
+                self.categories.setdefault(col, []).append(name[len(col) + 1:])
+        return self
+
+    def fit(self, df):
+        encoded = apply_feature_engineering(df.copy(deep=False))
+        layout = [c for c in encoded.columns
+                  if pd.api.types.is_numeric_dtype(encoded[c]) or pd.api.types.is_bool_dtype(encoded[c])]
+        return self._set_layout(layout)
+
+    def fit_stream(self, chunks):
+        """
+        Fit on an iterable of DataFrame chunks without holding them all in
+        memory. Produces the same layout ``fit`` would on their concatenation.
+        """
+        columns, non_numeric, vocab = {}, set(), {}
+        for chunk in chunks:
+            chunk = add_derived_features(chunk.copy(deep=False))
+            for col in chunk.columns:
+                if col in CATEGORICAL_FEATURES:
+                    vocab.setdefault(col, set()).update(chunk[col].dropna().unique())
+                    continue
+                columns.setdefault(col, None)
+                if not (pd.api.types.is_numeric_dtype(chunk[col]) or pd.api.types.is_bool_dtype(chunk[col])):
+                    non_numeric.add(col)
+
+        # Mirror get_dummies: plain columns in frame order, then sorted dummies (+ NaN) per categorical
+        layout = [c for c in columns if c not in non_numeric]
+        for col in CATEGORICAL_FEATURES:
+            if col in vocab:
+                layout += [f'{col}_{value}' for value in sorted(vocab[col])] + [f'{col}_nan']
+        return self._set_layout(layout)
 
     def transform(self, df):
-        return apply_feature_engineering(df)
+        if self.feature_names is None:
+            raise RuntimeError("FeatureEngineer is not fitted")
+        df = add_derived_features(df.copy(deep=False))
+        col_index = {name: i for i, name in enumerate(self.feature_names)}
+        X = np.zeros((len(df), len(self.feature_names)), dtype=np.float32)
+
+        # Features absent from the input stay 0, as reindex(fill_value=0) did
+        for name in self.numeric_features:
+            if name in df.columns:
+                X[:, col_index[name]] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float32, na_value=np.nan)
+
+        for col, labels in self.categories.items():
+            if col not in df.columns:
+                continue
+            values = df[col]
+            na_mask = values.isna().to_numpy()
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Recode via the (few) categories rather than every row
+                values = values.cat.rename_categories(values.cat.categories.astype(str))
+            elif not pd.api.types.is_string_dtype(values):
+                values = values.astype(str)
+            codes = pd.Categorical(values, categories=labels).codes.astype(np.intp)
+            codes[na_mask] = -1
+            targets = np.array([col_index[f'{col}_{label}'] for label in labels], dtype=np.intp)
+            rows = np.flatnonzero(codes >= 0)
+            X[rows, targets[codes[rows]]] = 1.0
+            if 'nan' in labels:
+                X[na_mask, col_index[f'{col}_nan']] = 1.0
+        return X
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+
+def get_feature_engineer(models):
+    """
+    Return the fitted FeatureEngineer stored with the models, rebuilding it
+    from ``feature_names`` for pickles trained before the encoder was saved.
+    """
+    fe = models.get('feature_engineer')
+    if fe is None:
+        if models.get('feature_names') is None:
+            raise ValueError("Models pickle has neither 'feature_engineer' nor 'feature_names'")
+        fe = FeatureEngineer.from_feature_names(models['feature_names'])
+        models['feature_engineer'] = fe
+    return fe
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Scalable synthetic project generator for load tests and large training runs.
+
+Same distributions as ``train_overrun.create_sample_data``, built column-wise
+with lookup tables instead of per-category ``df.loc`` passes. Rows are
+written as seeded shards: shard ``i`` always draws from
+``default_rng([seed, i])``, so the output is identical for any --workers.
+
+    python generate_data.py --rows 10000000 --shard-rows 1000000 --format parquet \\
+        --scenario baseline:0.6 --scenario vendor_delay:0.2 --scenario material_shortage:0.2
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_io import FORMATS, write_table
+from risk import classify_risk
+from scenario_presets import SCENARIOS
+
+
+PROJECT_TYPES = ['Substation', 'Overhead Line', 'Underground Cable']
+TERRAINS = ['Plains', 'Hills', 'Forest', 'Urban', 'Coastal']
+WEATHER_IMPACTS = ['Low', 'Medium', 'High']
+DEMAND_SUPPLY = ['Stable', 'Fluctuating', 'High Demand']
+VENDORS = [f"VEND-{i:02d}" for i in range(1, 26)]
+
+# (cost, timeline) estimate multipliers, indexed like the category lists above
+TYPE_MULT = np.array([[1.35, 1.18], [1.0, 1.0], [1.65, 1.35]])
+TERRAIN_MULT = np.array([[1.0, 1.0], [1.10, 1.10], [1.0, 1.0], [1.35, 1.25], [1.0, 1.0]])
+WEATHER_MULT = np.array([[1.0, 1.0], [1.0, 1.0], [1.12, 1.10]])
+
+# Columns make_variant keeps; --inputs-only writes just these (what /predict expects)
+INPUT_COLUMNS = [
+    'ProjectID', 'ProjectType', 'Terrain', 'WeatherImpact', 'DemandSupply', 'Vendor',
+    'Resources', 'ProjectLength', 'RegulatoryTime', 'HistoricalDelay', 'StartMonth',
+    'VendorOnTimeRate', 'VendorAvgDelay', 'RegulatoryPermitDays', 'PermitVariance',
+    'WeatherSeverityIndex', 'MaterialAvailabilityIndex', 'ResourceUtilization',
+    'HindranceCounts', 'HindranceRecentDays', 'MaterialCost', 'LabourCost',
+    'EstimatedCost', 'EstimatedTimeline',
+]
+
+
+def _categorical(rng, labels, n, p=None):
+    return pd.Categorical.from_codes(rng.choice(len(labels), n, p=p), categories=labels)
+
+
+def _apply_scenarios(df, rng, mix):
+    """Assign each row a scenario from ``mix`` ({name: (weight, spec)}) and apply its column tweaks."""
+    names = list(mix)
+    weights = np.array([mix[name][0] for name in names], dtype=float)
+    picks = rng.choice(len(names), len(df), p=weights / weights.sum())
+    for i, name in enumerate(names):
+        rows = picks == i
+        if not rows.any():
+            continue
+        for col, (factor, lower, upper) in mix[name][1].items():
+            values = df[col].to_numpy().copy()
+            tweaked = values[rows] * factor
+            if lower is not None or upper is not None:
+                tweaked = np.clip(tweaked, lower, upper)
+            values[rows] = tweaked  # integer columns truncate, like make_variant's astype(int)
+            df[col] = values
+    return pd.Categorical.from_codes(picks, categories=names)
+
+
+def generate_rows(n: int, rng: np.random.Generator, start_id: int = 0, mix: dict = None,
+                  cost_scale: float = 1.0, labels: bool = True) -> pd.DataFrame:
+    """
+    ``n`` synthetic projects with IDs from ``start_id``. ``mix`` maps scenario
+    names to (weight, spec); the scenario shifts the drivers before estimates
+    and actuals are derived, so labels reflect it. ``cost_scale`` rescales all
+    money columns like make_variant (overrun % unchanged).
+    """
+    df = pd.DataFrame({
+        'ProjectID': np.char.add('PG-', np.char.zfill(np.arange(start_id + 1, start_id + n + 1).astype(str), 8)),
+        'ProjectType': _categorical(rng, PROJECT_TYPES, n, p=[0.3, 0.45, 0.25]),
+        'Terrain': _categorical(rng, TERRAINS, n, p=[0.32, 0.22, 0.18, 0.18, 0.10]),
+        'WeatherImpact': _categorical(rng, WEATHER_IMPACTS, n, p=[0.5, 0.35, 0.15]),
+        'DemandSupply': _categorical(rng, DEMAND_SUPPLY, n, p=[0.45, 0.35, 0.20]),
+        'Vendor': _categorical(rng, VENDORS, n),
+        'Resources': rng.integers(80, 1200, n),
+        'ProjectLength': rng.uniform(8, 150, n),
+        'RegulatoryTime': rng.uniform(1, 30, n),
+        'HistoricalDelay': rng.uniform(0, 18, n),
+        'StartMonth': rng.integers(1, 13, n),
+        'VendorOnTimeRate': np.clip(rng.normal(0.8, 0.12, n), 0.2, 0.99),
+        'VendorAvgDelay': np.abs(rng.normal(1.8, 1.2, n)),
+        'RegulatoryPermitDays': np.clip(rng.normal(140, 35, n), 20, 380),
+        'PermitVariance': np.clip(rng.normal(25, 12, n), 0, 120),
+        'WeatherSeverityIndex': np.clip(rng.normal(0.45, 0.22, n), 0.0, 1.0),
+        'MaterialAvailabilityIndex': np.clip(rng.normal(0.72, 0.18, n), 0.0, 1.0),
+        'ResourceUtilization': np.clip(rng.normal(0.76, 0.12, n), 0.25, 1.0),
+        'HindranceCounts': rng.poisson(3.2, n),
+        'HindranceRecentDays': rng.integers(0, 240, n),
+        'MaterialCost': rng.uniform(200, 1500, n),
+        'LabourCost': rng.uniform(150, 1200, n),
+    })
+    scenario = _apply_scenarios(df, rng, mix or {'baseline': (1.0, {})})
+    c = {col: df[col].to_numpy(dtype=np.float64) for col in df.select_dtypes('number').columns}
+
+    phase = (c['StartMonth'] - 1) / 12 * 2 * np.pi
+    mult = (TYPE_MULT[df['ProjectType'].cat.codes] * TERRAIN_MULT[df['Terrain'].cat.codes]
+            * WEATHER_MULT[df['WeatherImpact'].cat.codes])
+    est_cost = (520 + c['Resources'] * 0.50 + c['ProjectLength'] * 2.1) * (1.0 + np.sin(phase) * 0.05)
+    est_cost = (est_cost + c['MaterialCost'] * 0.9 + c['LabourCost'] * 0.85) * mult[:, 0]
+    est_time = (5.0 + c['RegulatoryTime'] * 0.70 + c['HistoricalDelay'] * 0.40 + c['ProjectLength'] * 0.10) \
+        * (1.0 + np.cos(phase) * 0.05) * mult[:, 1]
+
+    df['MaterialCost'] = c['MaterialCost'] * cost_scale
+    df['LabourCost'] = c['LabourCost'] * max(0.5, min(cost_scale, 3.0))
+    df['EstimatedCost'] = np.maximum(est_cost, 100) * cost_scale
+    df['EstimatedTimeline'] = np.maximum(est_time, 1)
+    if not labels:
+        return df[INPUT_COLUMNS]
+
+    escalation = (1 - c['MaterialAvailabilityIndex']) * 180 + c['MaterialCost'] * 0.06
+    exec_cost = (30 + c['RegulatoryTime'] * 0.35 + c['HistoricalDelay'] * 0.45
+                 + (1 - c['VendorOnTimeRate']) * 140 + c['VendorAvgDelay'] * 10 + escalation
+                 + c['PermitVariance'] * 0.7 + c['WeatherSeverityIndex'] * 120
+                 + (1.0 - c['ResourceUtilization']) * 220 + c['HindranceCounts'] * 12)
+    exec_time = (0.8 + c['RegulatoryTime'] * 0.22 + c['HistoricalDelay'] * 0.35
+                 + (1 - c['VendorOnTimeRate']) * 7 + c['VendorAvgDelay'] * 0.6
+                 + (1 - c['MaterialAvailabilityIndex']) * 4.5
+                 + c['PermitVariance'] * 0.06 + c['WeatherSeverityIndex'] * 3.5
+                 + (1.0 - c['ResourceUtilization']) * 9 + c['HindranceCounts'] * 0.5)
+    df['CostEscalation'] = escalation * cost_scale
+    df['TotalCost'] = np.maximum(est_cost + exec_cost + rng.normal(0, 60, n), 120) * cost_scale
+    df['Timeline'] = np.maximum(est_time + exec_time + rng.normal(0, 2.2, n), 1)
+
+    df['CostOverrunPct'] = (df['TotalCost'] - df['EstimatedCost']) / df['EstimatedCost'] * 100.0
+    df['TimelineOverrunPct'] = (df['Timeline'] - df['EstimatedTimeline']) / df['EstimatedTimeline'] * 100.0
+    df['Overall_Risk'] = classify_risk(df['CostOverrunPct'], df['TimelineOverrunPct'])
+    df['Scenario'] = scenario
+    return df
+
+
+def load_scenarios(path: str = None) -> dict:
+    """Built-in SCENARIOS, plus/overridden by a JSON file of {name: {column: [factor, lower, upper]}}."""
+    scenarios = dict(SCENARIOS)
+    if path:
+        with open(path) as fh:
+            for name, spec in json.load(fh).items():
+                scenarios[name] = {col: tuple(list(v) + [None] * (3 - len(v))) for col, v in spec.items()}
+    return scenarios
+
+
+def parse_mix(entries, scenarios: dict) -> dict:
+    """``name[:weight]`` entries -> {name: (weight, spec)}."""
+    mix = {}
+    for entry in entries or ['baseline']:
+        name, _, weight = entry.partition(':')
+        if name not in scenarios:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {sorted(scenarios)}")
+        mix[name] = (float(weight) if weight else 1.0, scenarios[name])
+    return mix
+
+
+def write_shard(index: int, n: int, start_id: int, out_dir: str, fmt: str, seed: int,
+                mix: dict, cost_scale: float, labels: bool) -> tuple:
+    df = generate_rows(n, np.random.default_rng([seed, index]), start_id=start_id, mix=mix,
+                       cost_scale=cost_scale, labels=labels)
+    path = os.path.join(out_dir, f"part-{index:05d}.{fmt}")
+    write_table(df, path, fmt)
+    return path, len(df)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate sharded synthetic project data")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--shard-rows", type=int, default=1_000_000)
+    parser.add_argument("--output-dir", default="synthetic")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None, help="Shards written in parallel (default: CPU count)")
+    parser.add_argument("--scenario", action="append",
+                        help=f"name[:weight], repeatable; per-row mix of scenarios. Built in: {', '.join(SCENARIOS)}")
+    parser.add_argument("--scenarios-file", default=None, help="JSON of extra scenarios {name: {column: [factor, lower, upper]}}")
+    parser.add_argument("--cost-scale", type=float, default=1.0, help="Multiply all money columns (make_variant's cost tiers)")
+    parser.add_argument("--inputs-only", action="store_true",
+                        help="Only the columns an upload would have (no actuals, targets or scenario)")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.scenario, load_scenarios(args.scenarios_file))
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    starts = range(0, args.rows, args.shard_rows)
+    jobs = [(i, min(args.shard_rows, args.rows - start), start) for i, start in enumerate(starts)]
+    common = (args.output_dir, args.format, args.seed, mix, args.cost_scale, not args.inputs_only)
+    workers = min(args.workers or os.cpu_count() or 1, len(jobs))
+
+    if workers <= 1:
+        results = (write_shard(*job, *common) for job in jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        results = executor.map(write_shard, *zip(*[job + common for job in jobs]))
+    total = 0
+    for path, n in results:
+        total += n
+        print(f"Wrote {path} ({n} rows)")
+    if workers > 1:
+        executor.shutdown()
+    print(f"{total} rows in {len(jobs)} shard(s) under {args.output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
+import argparse
 import os
 import pandas as pd
+from data_io import FORMATS, write_table
 from train_overrun import create_sample_data
 
 
@@ -71,14 +73,18 @@ def make_variant(idx: int) -> pd.DataFrame:
     return df
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the dummy_variant test inputs")
+    parser.add_argument('--format', choices=FORMATS, default='csv', help="Parquet/Feather copies for benchmarking columnar inputs")
+    args = parser.parse_args(argv)
+
     out_dir = os.path.join(os.path.dirname(__file__), 'test_csvs')
     os.makedirs(out_dir, exist_ok=True)
 
     for i in range(1, 11):
         df = make_variant(i)
-        out_path = os.path.join(out_dir, f'dummy_variant_{i}.csv')
-        df.to_csv(out_path, index=False)
+        out_path = os.path.join(out_dir, f'dummy_variant_{i}.{args.format}')
+        write_table(df, out_path, args.format)
         print(f'Wrote {out_path} ({len(df)} rows)')
 
 
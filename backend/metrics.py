@@ -0,0 +1,182 @@
+"""
+Minimal in-process metrics primitives (no external client library required).
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with Prometheus-style cumulative ``le`` buckets.
+    Safe to observe from multiple threads.
+    """
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = sorted(float(b) for b in buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        """Observe the wall-clock seconds spent in the ``with`` block."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + [float("inf")], counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else f"{bound:g}"] = running
+        return {"buckets": cumulative, "count": running, "sum": total}
+
+
+class Counter:
+    """Monotonic counter, or read from ``fn`` at scrape time when given (e.g. another component's tally)."""
+
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self._fn = fn
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def value(self) -> float:
+        return float(self._fn()) if self._fn is not None else self._value
+
+
+class Gauge:
+    """Settable value, or read from ``fn`` at scrape time when given."""
+
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self._fn = fn
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def value(self) -> float:
+        return float(self._fn()) if self._fn is not None else self._value
+
+
+class Family:
+    """One named metric; a child per label-value tuple, created on first use."""
+
+    def __init__(self, name: str, help: str, kind: str, factory: Callable, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+    def children(self):
+        with self._lock:
+            return list(self._children.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Registry:
+    """
+    Named metrics rendered in the Prometheus text exposition format.
+    Unlabeled metrics return their single child directly.
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self._families: Dict[str, Family] = {}
+
+    def _add(self, name, help, kind, factory, labelnames):
+        family = Family(self.prefix + name, help, kind, factory, labelnames)
+        self._families[family.name] = family
+        return family if labelnames else family.labels()
+
+    def counter(self, name: str, help: str, fn: Optional[Callable[[], float]] = None, labelnames: Tuple[str, ...] = ()):
+        return self._add(name, help, "counter", lambda: Counter(fn), labelnames)
+
+    def gauge(self, name: str, help: str, fn: Optional[Callable[[], float]] = None, labelnames: Tuple[str, ...] = ()):
+        return self._add(name, help, "gauge", lambda: Gauge(fn), labelnames)
+
+    def histogram(self, name: str, help: str, buckets: Iterable[float], labelnames: Tuple[str, ...] = ()):
+        buckets = list(buckets)
+        return self._add(name, help, "histogram", lambda: Histogram(buckets), labelnames)
+
+    def register(self, name: str, help: str, histogram: Histogram) -> Histogram:
+        """Expose an existing, unlabeled Histogram (e.g. one owned by another component)."""
+        return self._add(name, help, "histogram", lambda: histogram, ())
+
+    def exposition(self) -> str:
+        lines = []
+        for family in self._families.values():
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in family.children():
+                pairs = list(zip(family.labelnames, values))
+                if family.kind == "histogram":
+                    snap = child.snapshot()
+                    for le, count in snap["buckets"].items():
+                        lines.append(f"{family.name}_bucket{_labels(pairs + [('le', le)])} {count}")
+                    lines.append(f"{family.name}_sum{_labels(pairs)} {_number(snap['sum'])}")
+                    lines.append(f"{family.name}_count{_labels(pairs)} {snap['count']}")
+                else:
+                    lines.append(f"{family.name}{_labels(pairs)} {_number(child.value())}")
+        return "\n".join(lines) + "\n"
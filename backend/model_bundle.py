@@ -0,0 +1,110 @@
+"""
+Loaded model artifact (best_models.pkl) plus the hot-path state derived from it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import time
+from typing import Optional
+
+import joblib
+import numpy as np
+import xgboost as xgb
+
+from drift import DriftSketch
+from feature_engineering import get_feature_engineer
+from schema import build_schema
+
+
+OVERRUN_MODEL_KEYS = ("cost_overrun_model", "timeline_overrun_model")
+LEGACY_MODEL_KEYS = ("cost_model", "timeline_model")
+
+
+def booster_predict(model, X: np.ndarray) -> np.ndarray:
+    """
+    Predict through XGBoost's native booster (``inplace_predict`` on float32),
+    skipping the sklearn wrapper's input conversion. Honours ``best_iteration``
+    for early-stopped models; non-XGBoost models fall back to ``predict``.
+    """
+    if not hasattr(model, "get_booster"):
+        return model.predict(X)
+    try:
+        iteration_range = (0, model.best_iteration + 1)
+    except AttributeError:
+        iteration_range = (0, 0)
+    return model.get_booster().inplace_predict(np.ascontiguousarray(X, dtype=np.float32), iteration_range=iteration_range)
+
+
+def booster_contribs(model, X: np.ndarray, approx: bool = False) -> np.ndarray:
+    """
+    Per-feature SHAP contributions from XGBoost's native ``pred_contribs``:
+    shape (rows, features + 1), the last column being the bias. Rows sum to
+    the raw prediction. ``approx`` uses the much cheaper Saabas attribution
+    (one path per tree) instead of exact TreeSHAP.
+    """
+    if not hasattr(model, "get_booster"):
+        raise ValueError(f"Contributions need an XGBoost model, got {type(model).__name__}")
+    try:
+        iteration_range = (0, model.best_iteration + 1)
+    except AttributeError:
+        iteration_range = (0, 0)
+    booster = model.get_booster()
+    dmatrix = xgb.DMatrix(np.ascontiguousarray(X, dtype=np.float32), missing=np.nan,
+                          feature_names=booster.feature_names, feature_types=booster.feature_types)
+    return booster.predict(dmatrix, pred_contribs=True, approx_contribs=approx, iteration_range=iteration_range)
+
+
+class ModelBundle:
+    """
+    One immutable snapshot of best_models.pkl.
+
+    Callers grab a reference once per request, so swapping in a new bundle
+    (hot reload) never changes the models under a request that is running.
+    ``version`` is a content hash of the pickle.
+    """
+
+    def __init__(self, models: dict, path: str, version: str, load_seconds: float, stat: Optional[os.stat_result] = None):
+        self.models = models
+        self.path = path
+        self.version = version
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+        self.stat_key = (stat.st_mtime_ns, stat.st_size) if stat is not None else None
+        self.feature_engineer = get_feature_engineer(models)
+        self.has_overrun_models = all(k in models for k in OVERRUN_MODEL_KEYS)
+        self.model_keys = OVERRUN_MODEL_KEYS if self.has_overrun_models else LEGACY_MODEL_KEYS
+        self.schema = build_schema(tuple(self.feature_engineer.feature_names))
+        # Training-time input/prediction distribution; artifacts older than drift.py have none
+        baseline = models.get("drift_baseline")
+        self.drift_baseline = DriftSketch.from_dict(baseline) if baseline else None
+
+    @classmethod
+    def load(cls, path: str, n_threads: Optional[int] = None) -> "ModelBundle":
+        t0 = time.perf_counter()
+        stat = os.stat(path)
+        with open(path, "rb") as fh:
+            content = fh.read()
+        models = joblib.load(io.BytesIO(content))
+        if n_threads:
+            for key in OVERRUN_MODEL_KEYS + LEGACY_MODEL_KEYS:
+                if key in models and hasattr(models[key], "set_params"):
+                    models[key].set_params(n_jobs=n_threads)
+        version = hashlib.sha256(content).hexdigest()[:12]
+        return cls(models, path, version, time.perf_counter() - t0, stat=stat)
+
+    def predict(self, key: str, X: np.ndarray) -> np.ndarray:
+        return booster_predict(self.models[key], X)
+
+    def contribs(self, key: str, X: np.ndarray, approx: bool = False) -> np.ndarray:
+        return booster_contribs(self.models[key], X, approx=approx)
+
+    def info(self) -> dict:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "load_seconds": round(self.load_seconds, 4),
+        }
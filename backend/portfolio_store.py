@@ -0,0 +1,273 @@
+"""
+Persistent store of scored projects keyed by ProjectID (SQLite, stdlib only).
+
+Each row keeps the project's standardized inputs (as JSON), a hash of
+those inputs, the model version that scored it and the model outputs.
+Upserts only rescore projects whose inputs changed or that were scored by
+another model version; after a model reload the stale rows are rescored
+in the background, batch by batch.
+"""
+
+from __future__ import annotations
+
+import io
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from prediction_cache import PredictionCache
+
+
+# Queryable input columns, stored alongside the JSON inputs
+FILTER_COLUMNS = ["ProjectType", "Terrain", "WeatherImpact", "DemandSupply", "State", "Vendor"]
+OUTPUT_COLUMNS = ["Predicted_Cost", "Predicted_Timeline", "Cost_Overrun_Pct", "Timeline_Overrun_Pct", "Overall_Risk"]
+SORT_COLUMNS = ["ProjectID"] + FILTER_COLUMNS + OUTPUT_COLUMNS
+# Inputs read out of the JSON for aggregates
+EXTRACTED_COLUMNS = ["StartMonth", "EstimatedCost", "EstimatedTimeline"]
+_QUOTED_OUTPUTS = ", ".join(f'"{c}"' for c in OUTPUT_COLUMNS)
+DEFAULT_RESCORE_ROWS = 50_000
+
+# score(df) -> (scored frame with OUTPUT_COLUMNS, model version that scored it)
+ScoreFn = Callable[[pd.DataFrame], Tuple[pd.DataFrame, str]]
+
+
+def input_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Signed 64-bit hash per row of everything but ProjectID (SQLite integers are signed)."""
+    return PredictionCache.row_keys(df, "").view(np.int64)
+
+
+def _sql_values(series: pd.Series) -> list:
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+class PortfolioStore:
+    """
+    Scored projects in one SQLite file. All access goes through one
+    connection under a lock; the background rescore takes it per batch, so
+    queries and upserts interleave with it.
+    """
+
+    def __init__(self, path: str, rescore_rows: int = DEFAULT_RESCORE_ROWS):
+        self.path = path
+        self.rescore_rows = rescore_rows
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._rescore_lock = threading.Lock()
+        self._rescore_thread: Optional[threading.Thread] = None
+        self._rescore_pending = False
+        self.rescored_rows = 0
+        # Bumped on every write, so results derived from the stored rows can be cached against it
+        self.generation = 0
+        self.last_rescore: Optional[dict] = None
+        columns = ", ".join(f'"{c}" TEXT' for c in FILTER_COLUMNS) + ", " + ", ".join(
+            f'"{c}" {"TEXT" if c == "Overall_Risk" else "REAL"}' for c in OUTPUT_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Durable across application crashes in WAL mode; only an OS crash can lose the last commits
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS projects (
+                    ProjectID TEXT PRIMARY KEY,
+                    input_hash INTEGER NOT NULL,
+                    model_version TEXT NOT NULL,
+                    inputs TEXT NOT NULL,
+                    {columns},
+                    updated_at REAL NOT NULL
+                )""")
+            for col in ["model_version", "Overall_Risk", "ProjectType", "Terrain", "Vendor"]:
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{col}" ON projects ("{col}")')
+
+    # -- writes -------------------------------------------------------------
+
+    def _write(self, scored: pd.DataFrame, hashes: np.ndarray, version: str, guard: bool = False) -> int:
+        """Insert or replace scored rows. With ``guard``, only rows whose stored inputs still match ``hashes``."""
+        inputs = scored.drop(columns=["ProjectID"] + [c for c in OUTPUT_COLUMNS if c in scored.columns])
+        # 15 decimals (pandas' maximum; the default 10 truncates small inputs) keeps stored floats within an ulp or so
+        payload = (inputs.to_json(orient="records", lines=True, double_precision=15).splitlines()
+                   if len(inputs.columns) else ["{}"] * len(scored))
+        columns = FILTER_COLUMNS + OUTPUT_COLUMNS
+        values = [_sql_values(scored[c]) if c in scored.columns else [None] * len(scored) for c in columns]
+        now = time.time()
+        rows = list(zip(scored["ProjectID"].tolist(), hashes.tolist(), [version] * len(scored), payload, *values,
+                        [now] * len(scored)))
+        quoted = ", ".join(f'"{c}"' for c in columns)
+        with self._lock, self._conn:
+            if guard:
+                # Skip rows upserted with new inputs while this batch was being scored
+                sql = (f'UPDATE projects SET model_version = ?, inputs = ?, '
+                       + ", ".join(f'"{c}" = ?' for c in columns) + ', updated_at = ? WHERE ProjectID = ? AND input_hash = ?')
+                cursor = self._conn.executemany(sql, [(r[2], r[3], *r[4:], r[0], r[1]) for r in rows])
+            else:
+                sql = (f'INSERT INTO projects (ProjectID, input_hash, model_version, inputs, {quoted}, updated_at) '
+                       f'VALUES ({", ".join("?" * (len(columns) + 5))}) ON CONFLICT(ProjectID) DO UPDATE SET '
+                       'input_hash = excluded.input_hash, model_version = excluded.model_version, inputs = excluded.inputs, '
+                       + ", ".join(f'"{c}" = excluded."{c}"' for c in columns) + ', updated_at = excluded.updated_at')
+                cursor = self._conn.executemany(sql, rows)
+            self.generation += 1
+            return cursor.rowcount
+
+    def upsert(self, df: pd.DataFrame, version: str, score: ScoreFn) -> dict:
+        """
+        Store a standardized upload. Only projects that are new, whose
+        inputs changed, or that were scored by another model version are
+        passed to ``score``; the rest are left untouched.
+        """
+        received = len(df)
+        df = df[df["ProjectID"].notna()].drop_duplicates("ProjectID", keep="last").reset_index(drop=True)
+        hashes = input_hashes(df)
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS incoming "
+                               "(ProjectID TEXT PRIMARY KEY, input_hash INTEGER, position INTEGER)")
+            self._conn.execute("DELETE FROM incoming")
+            self._conn.executemany("INSERT INTO incoming VALUES (?, ?, ?)",
+                                   zip(df["ProjectID"].tolist(), hashes.tolist(), range(len(df))))
+            changed = [row[0] for row in self._conn.execute(
+                "SELECT i.position FROM incoming i LEFT JOIN projects p ON p.ProjectID = i.ProjectID "
+                "WHERE p.ProjectID IS NULL OR p.input_hash != i.input_hash OR p.model_version != ?", (version,))]
+            self._conn.execute("DELETE FROM incoming")
+
+        mask = np.zeros(len(df), dtype=bool)
+        mask[changed] = True
+        if mask.any():
+            scored, scored_version = score(df[mask].reset_index(drop=True))
+            self._write(scored, hashes[mask], scored_version)
+        return {
+            "received": received,
+            "skipped": received - len(df),
+            "rescored": int(mask.sum()),
+            "unchanged": int(len(df) - mask.sum()),
+        }
+
+    # -- reads --------------------------------------------------------------
+
+    @staticmethod
+    def _where(filters: Dict[str, Sequence[str]]) -> Tuple[str, list]:
+        clauses, params = [], []
+        for col, values in filters.items():
+            if col not in ["ProjectID"] + FILTER_COLUMNS + ["Overall_Risk"]:
+                raise ValueError(f"Cannot filter on {col!r}")
+            if values:
+                clauses.append(f'"{col}" IN ({", ".join("?" * len(values))})')
+                params.extend(values)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, filters: Dict[str, Sequence[str]], sort: str = "ProjectID", limit: int = 100,
+              offset: int = 0) -> Tuple[pd.DataFrame, int]:
+        """
+        One page of stored projects matching ``filters`` ({column: allowed
+        values}), ordered by ``sort`` ("-Col" for descending). Returns the
+        page (inputs plus outputs, like /predict rows) and the total match count.
+        """
+        descending = sort.startswith("-")
+        column = sort.lstrip("-")
+        if column not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort on {column!r}; choose from {SORT_COLUMNS}")
+        where, params = self._where(filters)
+        order = f'"{column}" {"DESC" if descending else "ASC"}, ProjectID'
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM projects{where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT ProjectID, inputs, {_QUOTED_OUTPUTS} FROM projects{where} ORDER BY {order} LIMIT ? OFFSET ?", params + [limit, offset]).fetchall()
+        return self._frame(rows), total
+
+    def scored_frame(self, filters: Dict[str, Sequence[str]]) -> pd.DataFrame:
+        """
+        Every stored project matching ``filters`` with its queryable columns,
+        outputs and the estimates/StartMonth the dashboard aggregates need,
+        without decoding the full inputs.
+        """
+        where, params = self._where(filters)
+        extracted = ", ".join(f"json_extract(inputs, '$.{c}') AS \"{c}\"" for c in EXTRACTED_COLUMNS)
+        quoted = ", ".join(f'"{c}"' for c in FILTER_COLUMNS)
+        with self._lock:
+            frame = pd.read_sql_query(f"SELECT ProjectID, {quoted}, {_QUOTED_OUTPUTS}, {extracted} FROM projects{where}",
+                                      self._conn, params=params)
+        return frame.astype({c: np.float64 for c in EXTRACTED_COLUMNS})
+
+    @staticmethod
+    def _frame(rows: List[tuple]) -> pd.DataFrame:
+        if not rows:
+            return pd.DataFrame({c: [] for c in ["ProjectID"] + OUTPUT_COLUMNS})
+        ids, inputs, *outputs = zip(*rows)
+        frame = pd.read_json(io.StringIO("\n".join(inputs)), lines=True, dtype=False, convert_dates=False)
+        frame.insert(0, "ProjectID", list(ids))
+        for col, values in zip(OUTPUT_COLUMNS, outputs):
+            frame[col] = np.array(values, dtype=object if col == "Overall_Risk" else np.float64)
+        # Overruns come from float32 model outputs; keep them short when rendered
+        return frame.astype({"Cost_Overrun_Pct": np.float32, "Timeline_Overrun_Pct": np.float32})
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    def stats(self, version: str) -> dict:
+        with self._lock:
+            total, stale = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(model_version != ?), 0) FROM projects", (version,)).fetchone()
+        return {
+            "path": self.path,
+            "projects": total,
+            "stale": stale,
+            "model_version": version,
+            "rescoring": self.rescoring,
+            "rescored_rows": self.rescored_rows,
+            "last_rescore": self.last_rescore,
+        }
+
+    # -- background rescoring -----------------------------------------------
+
+    @property
+    def rescoring(self) -> bool:
+        return self._rescore_thread is not None
+
+    def rescore_stale(self, version_fn: Callable[[], str], score: ScoreFn) -> int:
+        """Rescore every row not scored by the current model, ``rescore_rows`` at a time; returns rows rescored."""
+        started, done = time.perf_counter(), 0
+        while True:
+            version = version_fn()
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT ProjectID, input_hash, inputs FROM projects WHERE model_version != ? LIMIT ?",
+                    (version, self.rescore_rows)).fetchall()
+            if not rows:
+                break
+            ids, hashes, inputs = zip(*rows)
+            frame = pd.read_json(io.StringIO("\n".join(inputs)), lines=True, dtype=False, convert_dates=False)
+            frame.insert(0, "ProjectID", list(ids))
+            scored, scored_version = score(frame)
+            # Rows upserted meanwhile are skipped; if the model changed mid-batch, the next round catches up
+            self._write(scored, np.asarray(hashes, dtype=np.int64), scored_version, guard=True)
+            done += len(rows)
+            self.rescored_rows += len(rows)
+        self.last_rescore = {"rows": done, "seconds": round(time.perf_counter() - started, 3), "finished_at": time.time()}
+        return done
+
+    def start_rescore(self, version_fn: Callable[[], str], score: ScoreFn) -> None:
+        """Rescore stale rows on a daemon thread; a request while one runs makes it go round once more."""
+        with self._rescore_lock:
+            self._rescore_pending = True
+            if self._rescore_thread is not None:
+                return
+            self._rescore_thread = threading.Thread(target=self._run_rescore, args=(version_fn, score),
+                                                     name="portfolio-rescore", daemon=True)
+            self._rescore_thread.start()
+
+    def _run_rescore(self, version_fn: Callable[[], str], score: ScoreFn) -> None:
+        while True:
+            with self._rescore_lock:
+                if not self._rescore_pending:
+                    self._rescore_thread = None
+                    return
+                self._rescore_pending = False
+            try:
+                self.rescore_stale(version_fn, score)
+            except Exception as e:
+                self.last_rescore = {"error": str(e), "finished_at": time.time()}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
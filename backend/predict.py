@@ -1,20 +1,39 @@
 #!/usr/bin/env python3
 """
 CLI to generate predictions and overrun metrics for the React dashboard.
-Input CSV -> augmented CSV with Predicted_* columns.
+Input CSV/Parquet/Feather -> augmented file with Predicted_* columns.
 """
 
 import argparse
+import json
+import multiprocessing
+import os
+import queue
 import sys
+import threading
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-import joblib
 
-from feature_engineering import apply_feature_engineering
-from schema import validate_and_standardize
+from data_io import ColumnarWriter, iter_chunks, projected_columns, read_table, table_format, write_table
+from feature_engineering import get_feature_engineer
+from schema import build_schema, csv_dtypes, validate_and_standardize
+from risk import assign_risk, LOW_RISK_THRESHOLD, HIGH_RISK_THRESHOLD
+from model_bundle import ModelBundle, booster_predict
+from scenarios import parse_sweep, run_sweep
+from explain import DEFAULT_TOP_K, explain_frame
 
 
-def compute_overruns(df: pd.DataFrame) -> pd.DataFrame:
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def load_models(path: str, n_threads: int = None) -> dict:
+    """Load the models pickle, optionally capping XGBoost's thread count."""
+    return ModelBundle.load(path, n_threads=n_threads).models
+
+
+def compute_overruns(df: pd.DataFrame, low: float = LOW_RISK_THRESHOLD, high: float = HIGH_RISK_THRESHOLD) -> pd.DataFrame:
     cost_baseline = None
     timeline_baseline = None
     if "EstimatedCost" in df.columns:
@@ -35,49 +54,25 @@ def compute_overruns(df: pd.DataFrame) -> pd.DataFrame:
         with np.errstate(divide="ignore", invalid="ignore"):
             df["Timeline_Overrun_Pct"] = ((df["Predicted_Timeline"] - timeline_baseline) / timeline_baseline) * 100.0
 
-    def risk_row(row) -> str:
-        cost_over = abs(row.get("Cost_Overrun_Pct", np.nan))
-        time_over = abs(row.get("Timeline_Overrun_Pct", np.nan))
-        vals = [v for v in [cost_over, time_over] if np.isfinite(v)]
-        if not vals:
-            return "Unknown"
-        avg = float(np.mean(vals))
-        if avg < 10:
-            return "Low"
-        if avg < 30:
-            return "Medium"
-        return "High"
-
-    df["Overall_Risk"] = df.apply(risk_row, axis=1)
+    df["Overall_Risk"] = assign_risk(df, low=low, high=high)
     return df
 
 
-def main(argv=None):
-    parser = argparse.ArgumentParser(description="Predict costs and timelines, compute overruns")
-    parser.add_argument("--input", required=True, help="Path to input CSV")
-    parser.add_argument("--output", required=True, help="Path to output CSV")
-    parser.add_argument("--models", default="best_models.pkl", help="Path to trained models pickle")
-    args = parser.parse_args(argv)
-
-    models = joblib.load(args.models)
+def score_frame(df: pd.DataFrame, models: dict, low: float = LOW_RISK_THRESHOLD, high: float = HIGH_RISK_THRESHOLD):
+    """
+    Validate, feature-engineer and score one frame.
 
-    df = pd.read_csv(args.input)
-    df, warnings = validate_and_standardize(df)
-    if warnings:
-        print("Warnings:")
-        for w in warnings:
-            print(f" - {w}")
+    Returns the augmented frame and the validation warnings.
+    """
+    fe = get_feature_engineer(models)
+    df, warnings = validate_and_standardize(df, build_schema(tuple(fe.feature_names)))
 
-    X = apply_feature_engineering(df.drop(columns=[c for c in ["TotalCost", "Timeline"] if c in df.columns]))
-    X = X.select_dtypes(include=[np.number])
-    feature_names = models.get("feature_names")
-    if feature_names is not None:
-        X = X.reindex(columns=feature_names, fill_value=0)
+    X = fe.transform(df.drop(columns=[c for c in ["TotalCost", "Timeline"] if c in df.columns]))
 
     # Predict handling both legacy absolute models and new overrun models
     if "cost_overrun_model" in models and "timeline_overrun_model" in models:
-        cost_over = models["cost_overrun_model"].predict(X)
-        time_over = models["timeline_overrun_model"].predict(X)
+        cost_over = booster_predict(models["cost_overrun_model"], X)
+        time_over = booster_predict(models["timeline_overrun_model"], X)
         # Baselines for reconstruction
         cost_base = df["EstimatedCost"] if "EstimatedCost" in df.columns else df.get("TotalCost", pd.Series(0, index=df.index))
         time_base = df["EstimatedTimeline"] if "EstimatedTimeline" in df.columns else df.get("Timeline", pd.Series(0, index=df.index))
@@ -86,17 +81,245 @@ def main(argv=None):
         df["Cost_Overrun_Pct"] = cost_over
         df["Timeline_Overrun_Pct"] = time_over
     else:
-        df["Predicted_Cost"] = models["cost_model"].predict(X)
-        df["Predicted_Timeline"] = models["timeline_model"].predict(X)
+        df["Predicted_Cost"] = booster_predict(models["cost_model"], X)
+        df["Predicted_Timeline"] = booster_predict(models["timeline_model"], X)
 
     if "Cost_Overrun_Pct" not in df.columns or "Timeline_Overrun_Pct" not in df.columns:
-        df = compute_overruns(df)
+        df = compute_overruns(df, low=low, high=high)
+    else:
+        df["Overall_Risk"] = assign_risk(df, low=low, high=high)
+    return df, warnings
+
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def _prefetch(iterable, depth: int = 2):
+    """Yield items of ``iterable`` produced ahead of time on a background thread."""
+    q: queue.Queue = queue.Queue(maxsize=depth)
+
+    def produce():
+        try:
+            for item in iterable:
+                q.put(item)
+        except BaseException as e:
+            q.put(_Failure(e))
+            return
+        q.put(_DONE)
+
+    threading.Thread(target=produce, name="chunk-reader", daemon=True).start()
+    while True:
+        item = q.get()
+        if item is _DONE:
+            return
+        if isinstance(item, _Failure):
+            raise item.exc
+        yield item
+
+
+class _ChunkWriter:
+    """
+    Append scored chunks to a CSV (or Parquet/Feather) file on a background thread.
+
+    The first chunk fixes the header; later chunks are reindexed onto it so
+    the column layout stays stable even if a chunk lacks an optional column.
+    """
+
+    def __init__(self, path: str, depth: int = 2):
+        self.path = path
+        self.columns = None
+        self.error = None
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._thread = threading.Thread(target=self._run, name="chunk-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        fmt = table_format(self.path)
+        header = True
+        with open(self.path, "wb" if fmt != "csv" else "w", newline=None if fmt != "csv" else "") as fh:
+            columnar = ColumnarWriter(fh, fmt) if fmt != "csv" else None
+            while True:
+                df = self._queue.get()
+                if df is _DONE:
+                    break
+                if self.error is not None:
+                    continue
+                try:
+                    if columnar is not None:
+                        columnar.write(df)
+                    else:
+                        df.to_csv(fh, header=header, index=False)
+                    header = False
+                except BaseException as e:
+                    self.error = e
+            if columnar is not None and self.error is None:
+                try:
+                    columnar.close()
+                except BaseException as e:
+                    self.error = e
+
+    def write(self, df: pd.DataFrame):
+        if self.error is not None:
+            raise self.error
+        if self.columns is None:
+            self.columns = list(df.columns)
+        elif list(df.columns) != self.columns:
+            df = df.reindex(columns=self.columns)
+        self._queue.put(df)
+
+    def close(self):
+        self._queue.put(_DONE)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+# Per-process state for --workers; loaded once by the pool initializer
+_worker_models = None
+_worker_thresholds = (LOW_RISK_THRESHOLD, HIGH_RISK_THRESHOLD)
 
-    df.to_csv(args.output, index=False)
+
+def _init_worker(models_path: str, n_threads: int, low: float, high: float):
+    global _worker_models, _worker_thresholds
+    _worker_models = load_models(models_path, n_threads=n_threads)
+    _worker_thresholds = (low, high)
+
+
+def _score_in_worker(chunk: pd.DataFrame):
+    low, high = _worker_thresholds
+    return score_frame(chunk, _worker_models, low=low, high=high)
+
+
+def _ordered_map(executor, fn, iterable, window: int):
+    """Like executor.map, but keeps at most ``window`` tasks in flight."""
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def stream_predictions(input_path: str, output_path: str, models_path: str, chunksize: int,
+                       low: float = LOW_RISK_THRESHOLD, high: float = HIGH_RISK_THRESHOLD, workers: int = 1):
+    """
+    Score ``input_path`` chunk by chunk, appending to ``output_path``.
+    Either can be CSV, Parquet or Feather (by extension).
+
+    Parsing and writing run on background threads so they overlap with
+    model inference; memory stays bounded by a few chunks. With ``workers``
+    > 1 chunks are scored in a process pool (each worker loads the models
+    once) and written back in input order. Returns the number of rows
+    written and a Counter of warnings (chunks each one occurred in).
+    """
+    warnings: Counter = Counter()
+    n_rows = 0
+    fmt = table_format(input_path)
+    # Loaded here even when workers score (they load their own): its schema drives the projection and read dtypes
+    bundle = ModelBundle.load(models_path)
+    columns = projected_columns(input_path, fmt, bundle.schema)
+    writer = _ChunkWriter(output_path)
+    try:
+        reader = iter_chunks(input_path, chunksize, columns=columns, dtype=csv_dtypes(bundle.schema), fmt=fmt)
+        if workers > 1:
+            # Split the cores between workers so XGBoost threads don't oversubscribe.
+            # Spawn rather than fork: the reader thread is already running here.
+            n_threads = max(1, (os.cpu_count() or 1) // workers)
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(models_path, n_threads, low, high),
+                                           mp_context=multiprocessing.get_context("spawn"))
+            results = _ordered_map(executor, _score_in_worker, _prefetch(reader), window=2 * workers)
+        else:
+            executor = None
+            results = (score_frame(chunk, bundle.models, low=low, high=high) for chunk in _prefetch(reader))
+        try:
+            for scored, chunk_warnings in results:
+                warnings.update(chunk_warnings)
+                writer.write(scored)
+                n_rows += len(scored)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+    finally:
+        writer.close()
+    return n_rows, warnings
+
+
+def _read_input(path: str, bundle: ModelBundle) -> pd.DataFrame:
+    fmt = table_format(path)
+    return read_table(path, columns=projected_columns(path, fmt, bundle.schema), dtype=csv_dtypes(bundle.schema), fmt=fmt)
+
+
+def print_warnings(warnings: Counter):
+    if not warnings:
+        return
+    print("Warnings:")
+    for w, count in warnings.items():
+        print(f" - {w}" + (f" ({count} chunks)" if count > 1 else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predict costs and timelines, compute overruns")
+    parser.add_argument("--input", required=True, help="Path to input CSV, Parquet or Feather (by extension)")
+    parser.add_argument("--output", required=True, help="Path to output CSV, Parquet or Feather (JSON summary with --scenarios)")
+    parser.add_argument("--models", default="best_models.pkl", help="Path to trained models pickle")
+    parser.add_argument("--low-threshold", type=float, default=LOW_RISK_THRESHOLD, help="Mean overrun %% below which risk is Low")
+    parser.add_argument("--high-threshold", type=float, default=HIGH_RISK_THRESHOLD, help="Mean overrun %% below which risk is Medium")
+    parser.add_argument("--chunksize", type=int, default=None, help="Stream the input in chunks of this many rows")
+    parser.add_argument("--workers", type=int, default=1, help="Score chunks in this many processes (implies --chunksize)")
+    parser.add_argument("--scenarios", default=None, help="JSON sweep spec: write risk shifts per what-if scenario instead of rows")
+    parser.add_argument("--explain", action="store_true", help="Write top feature contributions per project instead of predictions")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Contributions per project and model with --explain")
+    parser.add_argument("--high-only", action="store_true", help="With --explain, only explain High-risk projects")
+    parser.add_argument("--approx", action="store_true", help="With --explain, Saabas attributions instead of exact TreeSHAP")
+    args = parser.parse_args(argv)
+
+    if args.scenarios:
+        with open(args.scenarios) as fh:
+            sweep = parse_sweep(json.load(fh))
+        bundle = ModelBundle.load(args.models)
+        df = _read_input(args.input, bundle)
+        result = run_sweep(bundle, df, sweep, args.low_threshold, args.high_threshold)
+        with open(args.output, "w") as fh:
+            json.dump(result, fh, indent=2)
+        print(f"Wrote {len(result['scenarios'])} scenarios over {result['rows']} rows to {args.output}")
+        return
+
+    if args.explain:
+        bundle = ModelBundle.load(args.models)
+        df = _read_input(args.input, bundle)
+        df, warnings = score_frame(df, bundle.models, low=args.low_threshold, high=args.high_threshold)
+        print_warnings(Counter(warnings))
+        explanations = explain_frame(bundle, df, top_k=args.top_k, high_only=args.high_only, approx=args.approx)
+        write_table(explanations, args.output)
+        print(f"Wrote {len(explanations)} contributions for {explanations['ProjectID'].nunique()} projects to {args.output}")
+        return
+
+    if args.workers > 1 and not args.chunksize:
+        args.chunksize = DEFAULT_CHUNKSIZE
+
+    if args.chunksize:
+        n_rows, warnings = stream_predictions(args.input, args.output, args.models, args.chunksize,
+                                              low=args.low_threshold, high=args.high_threshold,
+                                              workers=args.workers)
+        print_warnings(warnings)
+        print(f"Wrote {n_rows} rows to {args.output}")
+        return
+
+    bundle = ModelBundle.load(args.models)
+    df = _read_input(args.input, bundle)
+    df, warnings = score_frame(df, bundle.models, low=args.low_threshold, high=args.high_threshold)
+    print_warnings(Counter(warnings))
+
+    write_table(df, args.output)
     print(f"Wrote {len(df)} rows to {args.output}")
 
 
 if __name__ == "__main__":
     main()
-
-
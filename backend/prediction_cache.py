@@ -0,0 +1,92 @@
+"""
+Row-level LRU cache of model outputs, keyed on the standardized feature row
+and the model version, so re-uploaded portfolios only score changed rows.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Identifiers don't influence predictions; two projects with identical inputs share an entry
+IGNORED_COLUMNS = ("ProjectID",)
+
+
+class PredictionCache:
+    """
+    Bounded LRU mapping a row key to the (cost, timeline) model outputs.
+
+    Keys are 64-bit hashes of the row's feature values (pandas'
+    ``hash_pandas_object``) mixed with the column set and model version,
+    so entries from an older best_models.pkl can never be returned.
+    Thread-safe.
+    """
+
+    def __init__(self, max_rows: int):
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[int, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def row_keys(features: pd.DataFrame, model_version: str) -> np.ndarray:
+        columns = sorted(c for c in features.columns if c not in IGNORED_COLUMNS)
+        prefix = hashlib.blake2b(repr((model_version, columns)).encode(), digest_size=8).digest()
+        row_hashes = pd.util.hash_pandas_object(features[columns], index=False).to_numpy()
+        return row_hashes ^ np.frombuffer(prefix, dtype=np.uint64)[0]
+
+    def lookup(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (outputs, missing): an (n, 2) float32 array filled for hits, and the positions that missed."""
+        outputs = np.empty((len(keys), 2), dtype=np.float32)
+        missing, hit_rows, hit_values = [], [], []
+        with self._lock:
+            entries = self._entries
+            for i, key in enumerate(keys.tolist()):
+                value = entries.get(key)
+                if value is None:
+                    missing.append(i)
+                else:
+                    entries.move_to_end(key)
+                    hit_rows.append(i)
+                    hit_values.append(value)
+            self.misses += len(missing)
+            self.hits += len(hit_rows)
+        if hit_rows:
+            outputs[hit_rows] = hit_values
+        return outputs, np.asarray(missing, dtype=np.intp)
+
+    def store(self, keys: np.ndarray, outputs: np.ndarray) -> None:
+        with self._lock:
+            entries = self._entries
+            for key, value in zip(keys.tolist(), outputs.tolist()):
+                if key in entries:
+                    entries.move_to_end(key)
+                entries[key] = value
+            overflow = len(entries) - self.max_rows
+            for _ in range(max(overflow, 0)):
+                entries.popitem(last=False)
+            self.evictions += max(overflow, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "rows": len(self._entries),
+                "max_rows": self.max_rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
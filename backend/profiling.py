@@ -0,0 +1,62 @@
+"""
+Low-overhead sampling profiler for individual requests.
+
+A background thread samples one thread's Python stack at a fixed interval
+and aggregates identical stacks. Results are written in the collapsed-stack
+format (``frame;frame;frame count``) that flamegraph.pl and speedscope read.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+
+class StackSampler:
+    """Sample ``thread_id`` (default: the thread that enters) every ``interval`` seconds while active."""
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "StackSampler":
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str) -> str:
+        """Write the collapsed stacks to ``path``, most frequent first."""
+        with open(path, "w") as fh:
+            for stack, count in self.samples.most_common():
+                fh.write(f"{stack} {count}\n")
+        return path
+
+
+def profile_path(directory: str, name: str, seconds: float) -> str:
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return os.path.join(directory, f"{name}-{stamp}-{seconds * 1000:.0f}ms-{threading.get_ident()}.folded")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Incremental retraining from an append-only store of completed projects.
+
+Rows the current artifact hasn't seen yet either continue boosting the saved
+overrun models (warm start), or trigger a full retrain on the whole store
+when the current models have drifted too far on them. Every run writes a
+new versioned artifact; --promote also swaps it in as best_models.pkl.
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import joblib
+import pandas as pd
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+
+from drift import capture_baseline, with_predictions
+from feature_engineering import FeatureEngineer, get_feature_engineer
+from model_bundle import OVERRUN_MODEL_KEYS
+from train_overrun import TARGETS, add_overrun_targets, evaluate, train_regressor
+
+
+NON_FEATURE_COLUMNS = TARGETS + ['ProjectID', 'TotalCost', 'Timeline', 'Overall_Risk']
+
+
+def store_files(store: str) -> list:
+    return sorted(glob.glob(os.path.join(store, '*.csv'))) if os.path.isdir(store) else [store]
+
+
+def read_actuals(store: str, manifest: dict = None):
+    """
+    Read labeled rows from ``store`` (a CSV or a directory of CSVs) that are
+    past the per-file row counts in ``manifest``. Files are append-only, so
+    already-consumed rows are skipped. Returns (frame, updated manifest).
+    """
+    manifest = manifest or {}
+    frames, updated = [], dict(manifest)
+    for path in store_files(store):
+        key = os.path.basename(path)
+        seen = manifest.get(key, 0)
+        df = pd.read_csv(path, skiprows=range(1, seen + 1))
+        updated[key] = seen + len(df)
+        if len(df):
+            frames.append(df)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if len(df):
+        required = ['EstimatedCost', 'EstimatedTimeline', 'TotalCost', 'Timeline']
+        missing = [c for c in required if c not in df.columns]
+        if missing:
+            raise ValueError(f"Actuals are missing columns: {missing}")
+        df = add_overrun_targets(df).dropna(subset=TARGETS)
+    return df, updated
+
+
+def continue_boosting(model, X, y, rounds: int, learning_rate: float = None):
+    """Add ``rounds`` trees to a fitted XGBRegressor, trained on the new rows only."""
+    booster = model.get_booster()
+    try:
+        # Drop trees grown past the early-stopping optimum before extending
+        booster = booster[: model.best_iteration + 1]
+    except AttributeError:
+        pass
+    params = model.get_params()
+    params.update(n_estimators=rounds, early_stopping_rounds=None)
+    if learning_rate:
+        params['learning_rate'] = learning_rate
+    if booster.feature_names is not None and not isinstance(X, pd.DataFrame):
+        # Boosters fitted on a named frame (the bundled artifact) reject unnamed matrices
+        X = pd.DataFrame(X, columns=booster.feature_names)
+    updated = xgb.XGBRegressor(**params)
+    updated.fit(X, y, xgb_model=booster)
+    return updated
+
+
+def drift_ratios(models: dict, X, df: pd.DataFrame) -> dict:
+    """MAE of the current models on new actuals relative to their training-time test MAE."""
+    reference = models.get('metrics', {})
+    ratios = {}
+    for target, key in zip(TARGETS, OVERRUN_MODEL_KEYS):
+        current = evaluate(models[key], X, df[target])
+        base = reference.get(target, {}).get('mae')
+        ratios[target] = current['mae'] / base if base else None
+        print(f"{target}: MAE on new actuals={current['mae']:.2f}"
+              + (f" (training reference {base:.2f}, ratio {ratios[target]:.2f})" if base else " (no training reference)"))
+    return ratios
+
+
+def warm_start(models: dict, df: pd.DataFrame, rounds: int, learning_rate: float = None) -> dict:
+    """
+    Continue boosting on 80% of the new rows. As in full_retrain, the held-out
+    20% gives the saved metrics and the training part the drift baseline, so
+    neither describes the parent model any more.
+    """
+    feature_engineer = get_feature_engineer(models)
+    X = df.drop(columns=[c for c in NON_FEATURE_COLUMNS if c in df.columns])
+    X_train, X_test, y_train, y_test = train_test_split(X, df[TARGETS], test_size=0.2, random_state=42)
+    X_train_fe = feature_engineer.transform(X_train)
+    X_test_fe = feature_engineer.transform(X_test)
+
+    updated, metrics = dict(models), {}
+    for target, key in zip(TARGETS, OVERRUN_MODEL_KEYS):
+        updated[key] = continue_boosting(models[key], X_train_fe, y_train[target], rounds, learning_rate)
+        metrics[target] = evaluate(updated[key], X_test_fe, y_test[target])
+        print(f"{target}: +{rounds} trees → held-out MAE {metrics[target]['mae']:.2f}")
+    updated['metrics'] = metrics
+    updated['drift_baseline'] = capture_baseline([with_predictions(X_train, updated, X_train_fe)], feature_engineer)
+    return updated
+
+
+def full_retrain(df: pd.DataFrame) -> dict:
+    X = df.drop(columns=[c for c in NON_FEATURE_COLUMNS if c in df.columns])
+    X_train, X_test, y_train, y_test = train_test_split(X, df[TARGETS], test_size=0.2, random_state=42)
+    feature_engineer = FeatureEngineer()
+    X_train_fe = feature_engineer.fit_transform(X_train)
+    X_test_fe = feature_engineer.transform(X_test)
+
+    models, metrics = {}, {}
+    for target, key in zip(TARGETS, OVERRUN_MODEL_KEYS):
+        models[key] = train_regressor(X_train_fe, X_test_fe, y_train[target], y_test[target], target)
+        metrics[target] = evaluate(models[key], X_test_fe, y_test[target])
+    models.update(feature_names=list(feature_engineer.feature_names), feature_engineer=feature_engineer, metrics=metrics)
+    models['drift_baseline'] = capture_baseline([with_predictions(X_train, models, X_train_fe)], feature_engineer)
+    return models
+
+
+def save_versioned(models: dict, out_dir: str) -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    stamp = models['lineage'][-1]['created_at'].replace(':', '').replace('-', '')
+    path = os.path.join(out_dir, f"best_models-{stamp}.pkl")
+    joblib.dump(models, path)
+    return path
+
+
+def promote(src: str, dest: str) -> None:
+    """Atomically replace ``dest`` so a hot-reloading API never sees a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(dest)), suffix='.pkl.tmp')
+    with os.fdopen(fd, 'wb') as out, open(src, 'rb') as fh:
+        out.write(fh.read())
+    os.replace(tmp, dest)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm-start the overrun models from new actuals")
+    parser.add_argument("--actuals", required=True, help="Append-only CSV, or directory of CSVs, of completed projects")
+    parser.add_argument("--models", default="best_models.pkl", help="Artifact to continue from")
+    parser.add_argument("--output-dir", default="model_versions", help="Where versioned artifacts are written")
+    parser.add_argument("--rounds", type=int, default=50, help="Trees added per model on a warm start")
+    parser.add_argument("--learning-rate", type=float, default=None, help="Learning rate for the added trees")
+    parser.add_argument("--drift-threshold", type=float, default=1.5,
+                        help="Full retrain when new-actuals MAE exceeds this multiple of the training MAE")
+    parser.add_argument("--min-rows", type=int, default=20, help="Skip the run with fewer new rows than this")
+    parser.add_argument("--full-retrain", action="store_true", help="Retrain from scratch on the whole store")
+    parser.add_argument("--promote", action="store_true", help="Also replace --models with the new artifact")
+    args = parser.parse_args(argv)
+
+    models = joblib.load(args.models)
+    if not all(k in models for k in OVERRUN_MODEL_KEYS):
+        raise SystemExit("Incremental training needs overrun models; run train_overrun.py first")
+
+    new_rows, manifest = read_actuals(args.actuals, models.get('actuals_manifest'))
+    print(f"{len(new_rows)} new labeled rows in {args.actuals}")
+    if len(new_rows) < args.min_rows and not args.full_retrain:
+        print(f"Fewer than {args.min_rows} new rows; nothing to do")
+        return
+
+    mode = 'full_retrain' if args.full_retrain else 'warm_start'
+    if mode == 'warm_start':
+        # Same fitted encoding as the saved trees, so the feature layout can't shift
+        X_new = get_feature_engineer(models).transform(new_rows.drop(columns=[c for c in NON_FEATURE_COLUMNS if c in new_rows.columns]))
+        ratios = drift_ratios(models, X_new, new_rows)
+        if any(r is not None and r > args.drift_threshold for r in ratios.values()):
+            print(f"Drift above {args.drift_threshold}x training error; retraining from scratch")
+            mode = 'full_retrain'
+
+    if mode == 'full_retrain':
+        all_rows, manifest = read_actuals(args.actuals)
+        updated = full_retrain(all_rows)
+    else:
+        updated = warm_start(models, new_rows, args.rounds, args.learning_rate)
+
+    updated['actuals_manifest'] = manifest
+    updated['lineage'] = list(models.get('lineage', [])) + [{
+        'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'mode': mode,
+        'parent': os.path.abspath(args.models),
+        'new_rows': int(len(new_rows)),
+    }]
+    path = save_versioned(updated, args.output_dir)
+    print(f"Saved {path} ({mode})")
+    if args.promote:
+        promote(path, args.models)
+        print(f"Promoted to {args.models}")
+
+
+if __name__ == '__main__':
+    main()
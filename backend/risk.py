@@ -0,0 +1,48 @@
+"""
+Vectorized Overall_Risk banding shared by the API and the CLI.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+LOW_RISK_THRESHOLD = 10.0
+HIGH_RISK_THRESHOLD = 30.0
+
+RISK_LABELS = ["Low", "Medium", "High"]
+
+
+def classify_risk(cost_over, time_over, low: float = LOW_RISK_THRESHOLD, high: float = HIGH_RISK_THRESHOLD) -> np.ndarray:
+    """
+    Band the mean absolute overrun (%) of each row into Low/Medium/High.
+
+    Non-finite overruns are ignored per row; rows with no finite overrun are
+    labelled "Unknown".
+    """
+    over = np.abs(np.column_stack([
+        np.asarray(cost_over, dtype=np.float64),
+        np.asarray(time_over, dtype=np.float64),
+    ]))
+    finite = np.isfinite(over)
+    count = finite.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg = np.where(finite, over, 0.0).sum(axis=1) / count
+
+    return np.select(
+        [count == 0, avg < low, avg < high],
+        ["Unknown", "Low", "Medium"],
+        default="High",
+    ).astype(object)
+
+
+def assign_risk(df: pd.DataFrame, low: float = LOW_RISK_THRESHOLD, high: float = HIGH_RISK_THRESHOLD) -> pd.Series:
+    """
+    Overall_Risk for each row of ``df`` from its Cost_/Timeline_Overrun_Pct columns.
+    Missing columns count as NaN, matching the old row-wise ``risk_row``.
+    """
+    nan = np.full(len(df), np.nan)
+    cost_over = df["Cost_Overrun_Pct"].to_numpy(dtype=np.float64, na_value=np.nan) if "Cost_Overrun_Pct" in df.columns else nan
+    time_over = df["Timeline_Overrun_Pct"].to_numpy(dtype=np.float64, na_value=np.nan) if "Timeline_Overrun_Pct" in df.columns else nan
+    return pd.Series(classify_risk(cost_over, time_over, low=low, high=high), index=df.index, name="Overall_Risk")
@@ -0,0 +1,16 @@
+"""
+Named input scenarios shared by the synthetic data generator
+(``generate_data.py --scenario``) and the what-if sweeps
+(``scenarios.py`` presets). Kept dependency-free so either can import it
+without pulling in the other.
+"""
+
+# The generate_test_csvs.make_variant tweaks as named scenarios: column -> (factor, lower, upper)
+SCENARIOS = {
+    'baseline': {},
+    'severe_weather': {'WeatherSeverityIndex': (1.25, 0.0, 1.0)},
+    'vendor_delay': {'VendorAvgDelay': (1.5, None, None), 'VendorOnTimeRate': (0.9, 0.0, 1.0)},
+    'material_shortage': {'MaterialAvailabilityIndex': (0.75, 0.0, 1.0), 'MaterialCost': (1.2, None, None)},
+    'regulatory': {'PermitVariance': (1.6, None, None), 'RegulatoryPermitDays': (1.1, None, None)},
+    'under_resourced': {'ResourceUtilization': (0.85, 0.0, 1.0), 'Resources': (0.9, None, None)},
+}
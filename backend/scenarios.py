@@ -0,0 +1,198 @@
+"""
+What-if sweeps: score a portfolio under many input perturbations at once.
+
+The portfolio is validated and encoded once. Each scenario only rewrites
+the feature-matrix columns its perturbations touch (the perturbed inputs
+and the numeric features derived from them), and all scenarios are scored
+in large stacked predict calls. Results are aggregated into Overall_Risk
+distributions and their shift against the unperturbed baseline.
+
+A sweep spec (JSON) combines any of:
+
+    {"presets": ["vendor_delay", "material_shortage"],
+     "scenarios": [{"name": "late vendors", "changes": {"VendorAvgDelay": 1.5}},
+                   {"name": "permits +30d", "changes": {"RegulatoryPermitDays": {"delta": 30}}}],
+     "grid": {"VendorAvgDelay": [1.0, 1.25, 1.5], "MaterialAvailabilityIndex": [1.0, 0.75]}}
+
+A change is a factor, or {"factor", "delta", "lower", "upper"}; values
+become ``clip(value * factor + delta, lower, upper)``.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from feature_engineering import add_derived_features
+from model_bundle import ModelBundle
+from risk import RISK_LABELS, classify_risk
+from scenario_presets import SCENARIOS as PRESETS
+from schema import validate_and_standardize
+
+# StartMonth also drives the Season categoricals, which a numeric delta can't express
+NON_PERTURBABLE = {"StartMonth"}
+DEFAULT_BATCH_ROWS = 500_000
+
+
+@dataclass(frozen=True)
+class Perturbation:
+    column: str
+    factor: float = 1.0
+    delta: float = 0.0
+    lower: Optional[float] = None
+    upper: Optional[float] = None
+
+    def apply(self, values: np.ndarray) -> np.ndarray:
+        out = values * self.factor + self.delta
+        if self.lower is not None or self.upper is not None:
+            out = np.clip(out, self.lower, self.upper)
+        return out
+
+    def describe(self) -> dict:
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
+
+def _perturbation(column: str, change) -> Perturbation:
+    if isinstance(change, (int, float)):
+        return Perturbation(column, factor=float(change))
+    if isinstance(change, (list, tuple)):
+        # generate_data preset form: (factor, lower, upper)
+        factor, lower, upper = (list(change) + [None, None])[:3]
+        return Perturbation(column, factor=float(factor), lower=lower, upper=upper)
+    unknown = set(change) - {"factor", "delta", "lower", "upper"}
+    if unknown:
+        raise ValueError(f"Unknown keys for {column}: {sorted(unknown)}")
+    return Perturbation(column, **{k: float(v) for k, v in change.items()})
+
+
+def parse_sweep(spec: dict) -> List[Tuple[str, List[Perturbation]]]:
+    """Expand presets, named scenarios and the Cartesian grid into (name, perturbations) pairs."""
+    sweep = []
+    for name in spec.get("presets", []):
+        if name not in PRESETS:
+            raise ValueError(f"Unknown preset {name!r}; choose from {sorted(PRESETS)}")
+        sweep.append((name, [_perturbation(col, change) for col, change in PRESETS[name].items()]))
+    for i, scenario in enumerate(spec.get("scenarios", [])):
+        changes = scenario.get("changes", {})
+        sweep.append((scenario.get("name", f"scenario_{i + 1}"),
+                      [_perturbation(col, change) for col, change in changes.items()]))
+    grid = spec.get("grid", {})
+    if grid:
+        columns = list(grid)
+        for factors in itertools.product(*(grid[col] for col in columns)):
+            name = ", ".join(f"{col} x{factor:g}" for col, factor in zip(columns, factors))
+            sweep.append((name, [Perturbation(col, factor=float(factor)) for col, factor in zip(columns, factors)]))
+    if not sweep:
+        raise ValueError("Sweep has no presets, scenarios or grid")
+    return sweep
+
+
+def _overruns(bundle: ModelBundle, outputs: np.ndarray, cost_base: np.ndarray, time_base: np.ndarray):
+    if bundle.has_overrun_models:
+        return outputs[:, 0], outputs[:, 1]
+    # Legacy absolute models: overrun against the (possibly perturbed) estimates
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (outputs[:, 0] - cost_base) / cost_base * 100.0, (outputs[:, 1] - time_base) / time_base * 100.0
+
+
+def _summary(risk: np.ndarray, cost_over: np.ndarray, time_over: np.ndarray) -> dict:
+    labels = RISK_LABELS + ["Unknown"]
+    counts = {label: int(np.count_nonzero(risk == label)) for label in labels}
+    n = max(len(risk), 1)
+    return {
+        "risk_counts": counts,
+        "risk_share": {label: counts[label] / n for label in labels},
+        "mean_cost_overrun_pct": float(np.nanmean(cost_over)) if len(cost_over) else None,
+        "mean_timeline_overrun_pct": float(np.nanmean(time_over)) if len(time_over) else None,
+    }
+
+
+def run_sweep(bundle: ModelBundle, df: pd.DataFrame, sweep: List[Tuple[str, List[Perturbation]]],
+              low: float, high: float, batch_rows: int = DEFAULT_BATCH_ROWS) -> dict:
+    """Score ``df`` under every scenario of ``sweep``; returns the baseline and per-scenario risk summaries."""
+    df, _ = validate_and_standardize(df, bundle.schema)
+    features = df.drop(columns=[c for c in ["TotalCost", "Timeline"] if c in df.columns])
+    X_base = bundle.feature_engineer.transform(features)
+    col_index = {name: i for i, name in enumerate(bundle.feature_engineer.feature_names)}
+
+    numeric = [name for name, spec in bundle.schema.items() if spec.numeric and name in features.columns]
+    raw = features[numeric]
+    derived = [c for c in add_derived_features(raw.iloc[:0].copy()).columns if c not in raw.columns]
+    for _, perturbations in sweep:
+        for p in perturbations:
+            if p.column in NON_PERTURBABLE or p.column not in raw.columns:
+                raise ValueError(f"Cannot perturb {p.column!r}: perturbable columns in this upload are "
+                                 f"{sorted(set(raw.columns) - NON_PERTURBABLE)}")
+
+    def estimates(frame: pd.DataFrame, est: str, actual: str) -> np.ndarray:
+        # Estimates may be perturbed; actuals aren't features, so they come from the upload
+        if est in frame.columns:
+            return frame[est].to_numpy(np.float64)
+        if actual in df.columns:
+            return df[actual].to_numpy(np.float64)
+        return np.full(len(frame), np.nan)
+
+    def scenario_matrix(perturbations):
+        if not perturbations:
+            return X_base, raw
+        shifted = raw.copy()
+        for p in perturbations:
+            shifted[p.column] = p.apply(shifted[p.column].to_numpy())
+        recomputed = add_derived_features(shifted.copy())
+        X = X_base.copy()
+        for name in {p.column for p in perturbations} | set(derived):
+            if name in col_index and name in recomputed.columns:
+                X[:, col_index[name]] = recomputed[name].to_numpy(dtype=np.float32, na_value=np.nan)
+        return X, shifted
+
+    # Stack scenario matrices up to batch_rows and score each stack with one predict per model
+    cases = [("baseline", [])] + list(sweep)
+    cost_key, time_key = bundle.model_keys
+    results, pending, pending_rows = [], [], 0
+
+    def flush():
+        X = np.vstack([item[1] for item in pending])
+        outputs = np.column_stack([bundle.predict(cost_key, X), bundle.predict(time_key, X)])
+        start = 0
+        for name, _, frame, perturbations in pending:
+            block = outputs[start:start + len(frame)]
+            start += len(frame)
+            results.append((name, perturbations, *_overruns(bundle, block, estimates(frame, "EstimatedCost", "TotalCost"),
+                                                            estimates(frame, "EstimatedTimeline", "Timeline"))))
+        pending.clear()
+
+    for name, perturbations in cases:
+        X, frame = scenario_matrix(perturbations)
+        if pending and pending_rows + len(X) > batch_rows:
+            flush()
+            pending_rows = 0
+        pending.append((name, X, frame, perturbations))
+        pending_rows += len(X)
+    flush()
+
+    _, _, base_cost, base_time = results[0]
+    base_risk = classify_risk(base_cost, base_time, low=low, high=high)
+    base_rank = pd.Categorical(base_risk, categories=RISK_LABELS).codes
+    baseline = _summary(base_risk, base_cost, base_time)
+
+    scenarios = []
+    for name, perturbations, cost_over, time_over in results[1:]:
+        risk = classify_risk(cost_over, time_over, low=low, high=high)
+        summary = _summary(risk, cost_over, time_over)
+        rank = pd.Categorical(risk, categories=RISK_LABELS).codes
+        known = (rank >= 0) & (base_rank >= 0)
+        scenarios.append({
+            "name": name,
+            "changes": [p.describe() for p in perturbations],
+            **summary,
+            "share_shift": {label: summary["risk_share"][label] - baseline["risk_share"][label]
+                            for label in summary["risk_share"]},
+            "moved_up": int(np.count_nonzero(known & (rank > base_rank))),
+            "moved_down": int(np.count_nonzero(known & (rank < base_rank))),
+        })
+
+    return {"rows": len(df), "thresholds": {"low": low, "high": high}, "baseline": baseline, "scenarios": scenarios}
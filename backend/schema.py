@@ -1,13 +1,24 @@
 """
 Lightweight schema and validation utilities for project data.
 No external validation libs required.
+
+The schema is declarative: every known column has a kind (id, category,
+float64, integer) and optional bounds. It drives the dtypes
+``read_csv`` parses with, the coercion done by validation, and the
+row-level error report, all computed column-wise in one pass.
 """
 
 from __future__ import annotations
 
-from typing import List, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
+from feature_engineering import CATEGORICAL_FEATURES, add_derived_features
+
 
 REQUIRED_COLUMNS: List[str] = [
     "ProjectID",
@@ -35,14 +46,124 @@ OPTIONAL_COLUMNS: List[str] = [
     "ProjectLength",
     "RegulatoryTime",
     "HistoricalDelay",
+    "StartMonth",
+    "VendorOnTimeRate",
+    "VendorAvgDelay",
+    "RegulatoryPermitDays",
+    "PermitVariance",
+    "WeatherSeverityIndex",
+    "MaterialAvailabilityIndex",
+    "ResourceUtilization",
+    "HindranceCounts",
+    "HindranceRecentDays",
 ]
 
 
-def validate_and_standardize(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+@dataclass(frozen=True)
+class ColumnSpec:
+    name: str
+    kind: str  # "id" | "category" | "float64" | "integer"
+    required: bool = False
+    lower: Optional[float] = None
+    upper: Optional[float] = None
+
+    @property
+    def numeric(self) -> bool:
+        return self.kind in ("float64", "integer")
+
+
+# Floats stay float64: inputs are echoed back unchanged, and money rebuilds Predicted_Cost/Timeline.
+# Only the feature matrix is float32. Counts are stored as the smallest int type that holds them (lossless).
+_KINDS: Dict[str, Tuple[str, Optional[float], Optional[float]]] = {
+    "ProjectID": ("id", None, None),
+    "TotalCost": ("float64", 0, None),
+    "Timeline": ("float64", 0, None),
+    "EstimatedCost": ("float64", 0, None),
+    "EstimatedTimeline": ("float64", 0, None),
+    "MaterialCost": ("float64", 0, None),
+    "LabourCost": ("float64", 0, None),
+    "CostEscalation": ("float64", None, None),
+    "Resources": ("integer", 0, None),
+    "StartMonth": ("integer", 1, 12),
+    "HindranceCounts": ("integer", 0, None),
+    "HindranceRecentDays": ("integer", 0, None),
+    "ProjectLength": ("float64", 0, None),
+    "RegulatoryTime": ("float64", 0, None),
+    "HistoricalDelay": ("float64", 0, None),
+    "VendorOnTimeRate": ("float64", 0, 1),
+    "VendorAvgDelay": ("float64", 0, None),
+    "RegulatoryPermitDays": ("float64", 0, None),
+    "PermitVariance": ("float64", 0, None),
+    "WeatherSeverityIndex": ("float64", 0, 1),
+    "MaterialAvailabilityIndex": ("float64", 0, 1),
+    "ResourceUtilization": ("float64", 0, 1),
+}
+
+
+def _spec(name: str) -> ColumnSpec:
+    kind, lower, upper = _KINDS.get(name, ("category", None, None))
+    return ColumnSpec(name, kind, required=name in REQUIRED_COLUMNS, lower=lower, upper=upper)
+
+
+SCHEMA: Dict[str, ColumnSpec] = {name: _spec(name) for name in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+
+
+def _derived_columns() -> set:
+    probe = pd.DataFrame({name: [1.0] if spec.numeric else ["x"] for name, spec in SCHEMA.items()})
+    return set(add_derived_features(probe).columns) - set(probe.columns)
+
+
+@lru_cache(maxsize=8)
+def build_schema(feature_names: Tuple[str, ...] = ()) -> Dict[str, ColumnSpec]:
+    """
+    SCHEMA extended with the raw numeric inputs of a model's feature list
+    (dummies and derived features excluded), as optional float64 columns.
     """
-    Validate required columns and gently standardize types.
+    schema = dict(SCHEMA)
+    derived = _derived_columns()
+    for name in feature_names:
+        is_dummy = any(name.startswith(col + "_") for col in CATEGORICAL_FEATURES)
+        if name not in schema and name not in derived and not is_dummy:
+            schema[name] = ColumnSpec(name, "float64")
+    return schema
 
-    Returns the (possibly modified) DataFrame and a list of warnings.
+
+def csv_dtypes(schema: Dict[str, ColumnSpec] = SCHEMA) -> Dict[str, str]:
+    """
+    ``read_csv`` dtypes: IDs as str and categoricals as category, parsed that
+    way up front. Numerics keep the C parser's native inference so one bad
+    cell doesn't abort the upload; validation coerces and reports them.
+    """
+    return {name: ("str" if spec.kind == "id" else "category")
+            for name, spec in schema.items() if spec.kind in ("id", "category")}
+
+
+def _smallest_int(col: pd.Series):
+    lo, hi = (int(col.min()), int(col.max())) if len(col) else (0, 0)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return np.int64
+
+
+def _summarize(errors: pd.DataFrame, limit: int = 5) -> List[str]:
+    lines = []
+    for (column, error), group in errors.groupby(["column", "error"], sort=False):
+        rows = ", ".join(str(r) for r in group["row"].iloc[:limit])
+        more = ", ..." if len(group) > limit else ""
+        lines.append(f"Column '{column}': {len(group)} {error} (rows {rows}{more})")
+    return lines
+
+
+def validate_frame(df: pd.DataFrame, schema: Dict[str, ColumnSpec] = SCHEMA):
+    """
+    Check required columns, coerce every schema column to its kind and
+    collect row-level errors in one column-wise pass.
+
+    Returns (frame, warnings, errors) where ``errors`` has one row per bad
+    cell: row (the frame's index label), column, error. Unparseable numerics
+    become NaN; out-of-range values are reported but kept.
     """
     warnings: List[str] = []
 
@@ -57,28 +178,65 @@ def validate_and_standardize(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]
     if "EstimatedTimeline" not in df.columns:
         warnings.append("Column 'EstimatedTimeline' not found; falling back to 'Timeline' for overrun calc if present.")
 
-    # Ensure numeric columns are numeric when present
-    numeric_candidates = [
-        "TotalCost",
-        "Timeline",
-        "EstimatedCost",
-        "EstimatedTimeline",
-        "MaterialCost",
-        "LabourCost",
-        "CostEscalation",
-        "Resources",
-        "ProjectLength",
-        "RegulatoryTime",
-        "HistoricalDelay",
-    ]
-    for col in numeric_candidates:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    # Basic ID standardization
-    if "ProjectID" in df.columns:
-        df["ProjectID"] = df["ProjectID"].astype(str)
+    present = [schema[c] for c in df.columns if c in schema]
+    masks, labels = [], []
 
-    return df, warnings
+    required = [s.name for s in present if s.required]
+    if required:
+        masks.append(df[required].isna().to_numpy())
+        labels += [(name, "missing required value(s)") for name in required]
+
+    bounded, coerced = [], {}
+    for spec in present:
+        col = df[spec.name]
+        if spec.kind == "id":
+            coerced[spec.name] = col.astype(str)
+        elif spec.kind == "category":
+            if not isinstance(col.dtype, pd.CategoricalDtype):
+                coerced[spec.name] = col.astype("category")
+        else:
+            if col.dtype.kind not in "iufb":
+                numbers = pd.to_numeric(col, errors="coerce")
+                masks.append((numbers.isna() & col.notna()).to_numpy()[:, None])
+                labels.append((spec.name, "non-numeric value(s) set to NaN"))
+                col = numbers
+            if spec.kind == "integer" and col.dtype.kind in "iu":
+                col = col.astype(_smallest_int(col))
+            else:
+                col = col.astype(np.float64)
+            coerced[spec.name] = col
+            if spec.lower is not None or spec.upper is not None:
+                bounded.append(spec)
 
+    if coerced:
+        df = df.assign(**coerced)
 
+    if bounded:
+        values = df[[s.name for s in bounded]].to_numpy(dtype=np.float64, na_value=np.nan)
+        lower = np.array([-np.inf if s.lower is None else s.lower for s in bounded])
+        upper = np.array([np.inf if s.upper is None else s.upper for s in bounded])
+        with np.errstate(invalid="ignore"):
+            masks.append((values < lower) | (values > upper))
+        labels += [(s.name, f"value(s) outside [{s.lower}, {s.upper}]") for s in bounded]
+
+    errors = pd.DataFrame({"row": [], "column": [], "error": []})
+    # Most uploads are clean: only materialize the error matrix when something failed
+    if any(mask.any() for mask in masks):
+        # Transposed so errors come out grouped by column, in row order
+        cols, rows = np.nonzero(np.hstack(masks).T)
+        names = np.array([label[0] for label in labels], dtype=object)
+        reasons = np.array([label[1] for label in labels], dtype=object)
+        errors = pd.DataFrame({"row": df.index.to_numpy()[rows], "column": names[cols], "error": reasons[cols]})
+        warnings += _summarize(errors)
+
+    return df, warnings, errors
+
+
+def validate_and_standardize(df: pd.DataFrame, schema: Dict[str, ColumnSpec] = SCHEMA) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Validate required columns and standardize types per ``schema``.
+
+    Returns the (possibly modified) DataFrame and a list of warnings.
+    """
+    df, warnings, _ = validate_frame(df, schema)
+    return df, warnings
@@ -0,0 +1,140 @@
+"""
+Response encodings for scored frames: row JSON, columnar JSON, streamed CSV,
+Arrow IPC, Parquet and Feather, with an optional ``fields=`` column projection.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+from typing import List, Optional
+
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from data_io import compact_predictions, write_table
+
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+FEATHER_MEDIA_TYPE = "application/vnd.apache.arrow.file"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+FORMATS = ("json", "columns", "csv", "arrow", "parquet", "feather")
+CSV_STREAM_ROWS = 10_000
+# Significant decimal digits that identify any float32
+FLOAT32_DIGITS = 9
+
+_ACCEPT_FORMATS = {
+    ARROW_MEDIA_TYPE: "arrow",
+    FEATHER_MEDIA_TYPE: "feather",
+    PARQUET_MEDIA_TYPE: "parquet",
+    "application/x-parquet": "parquet",
+    "text/csv": "csv",
+    "application/json": "json",
+}
+
+
+def negotiate_format(fmt: Optional[str], accept: Optional[str]) -> str:
+    """Pick a response format from an explicit ``format=`` or the Accept header (default: row JSON)."""
+    if fmt:
+        if fmt not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unknown format '{fmt}'; expected one of {list(FORMATS)}")
+        return fmt
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in _ACCEPT_FORMATS:
+            return _ACCEPT_FORMATS[media_type]
+    return "json"
+
+
+def select_fields(df: pd.DataFrame, fields: Optional[str]) -> pd.DataFrame:
+    """
+    Project ``df`` onto a comma-separated list of column names or globs
+    (e.g. ``ProjectID,Predicted_*,Overall_Risk``). Names that match no
+    column are skipped, so clients can ask for optional inputs.
+    """
+    if not fields:
+        return df
+    columns: List[str] = []
+    for pattern in (f.strip() for f in fields.split(",")):
+        if not pattern:
+            continue
+        matches = fnmatch.filter(df.columns, pattern) if any(ch in pattern for ch in "*?[") else (
+            [pattern] if pattern in df.columns else [])
+        columns.extend(c for c in matches if c not in columns)
+    return df[columns]
+
+
+def _widen_float32(series: pd.Series) -> pd.Series:
+    """float32 as the float64 of its shortest repr, so 0.7656 isn't emitted as 0.765599966049194."""
+    if series.dtype != np.float32:
+        return series
+    narrow = series.to_numpy()
+    values = narrow.astype(np.float64)
+    # Zero, NaN and inf have no magnitude to round at
+    pending = np.flatnonzero(np.isfinite(values) & (values != 0))
+    with np.errstate(over="ignore"):
+        exponent = -np.floor(np.log10(np.abs(values[pending])))
+        # Fewest significant digits that still read back as the same float32 (at most 9 are needed)
+        for digits in range(1, FLOAT32_DIGITS + 1):
+            # Scale by powers of ten >= 1, which are exact
+            up = 10.0 ** np.maximum(exponent + digits - 1, 0)
+            down = 10.0 ** np.maximum(1 - digits - exponent, 0)
+            rounded = np.round(values[pending] * up / down) * down / up
+            exact = rounded.astype(np.float32) == narrow[pending]
+            values[pending[exact]] = rounded[exact]
+            pending, exponent = pending[~exact], exponent[~exact]
+            if not len(pending):
+                break
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _column_values(series: pd.Series) -> list:
+    series = _widen_float32(series)
+    values = series.to_numpy(dtype=object, na_value=None)
+    if series.dtype.kind == "f":
+        # JSON has no NaN/inf
+        values = np.where(np.isfinite(series.to_numpy(dtype=np.float64, na_value=np.nan)), values, None)
+    return values.tolist()
+
+
+def json_records(df: pd.DataFrame) -> list:
+    """Rows as JSON-safe dicts: float32 widened, NaN/inf as None."""
+    columns = {col: _column_values(df[col]) for col in df.columns}
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def _csv_chunks(df: pd.DataFrame):
+    for start in range(0, max(len(df), 1), CSV_STREAM_ROWS):
+        yield df.iloc[start:start + CSV_STREAM_ROWS].to_csv(index=False, header=start == 0)
+
+
+def render(df: pd.DataFrame, fmt: str = "json") -> Response:
+    if fmt == "columns":
+        return JSONResponse({
+            "length": len(df),
+            "columns": {col: _column_values(df[col]) for col in df.columns},
+        })
+    if fmt == "csv":
+        return StreamingResponse(_csv_chunks(df), media_type="text/csv")
+    if fmt == "arrow":
+        # Same float32 prediction columns as the Parquet/Feather outputs
+        table = pa.Table.from_pandas(compact_predictions(df), preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), media_type=ARROW_MEDIA_TYPE)
+    if fmt in ("parquet", "feather"):
+        sink = io.BytesIO()
+        write_table(df, sink, fmt)
+        return Response(sink.getvalue(), media_type=PARQUET_MEDIA_TYPE if fmt == "parquet" else FEATHER_MEDIA_TYPE)
+    # Return JSON rows
+    narrow = [col for col in df.columns if df[col].dtype == np.float32]
+    if narrow:
+        df = df.assign(**{col: _widen_float32(df[col]) for col in narrow})
+    return JSONResponse({
+        "rows": df.to_dict(orient="records")
+    })
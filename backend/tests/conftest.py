@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Backend modules import each other flat (``from schema import ...``), as when run from backend/
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from drift import PSI_MODERATE, PSI_SIGNIFICANT, DriftMonitor, DriftSketch, psi
+
+
+class _Encoder:
+    numeric_features = ["VendorOnTimeRate", "CostEscalation"]
+    categories = {"Vendor": ["A", "B", "C"]}
+
+
+def _frame(n, seed, shift=0.0, vendors=("A", "B", "C"), escalation=True):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "VendorOnTimeRate": np.clip(rng.normal(0.8 - shift, 0.05, n), 0, 1),
+        "Vendor": rng.choice(list(vendors), n),
+        "Cost_Overrun_Pct": rng.normal(10, 5, n),
+    })
+    if escalation:
+        df["CostEscalation"] = rng.normal(1e5, 1e4, n)
+    return df
+
+
+@pytest.fixture
+def baseline():
+    train = _frame(20_000, 0)
+    sketch = DriftSketch.fit(train, _Encoder())
+    sketch.update(train)
+    return sketch
+
+
+def _columns(live, baseline):
+    return {c["column"]: c for c in live.compare(baseline)}
+
+
+def test_psi_is_zero_for_identical_shares():
+    counts = np.array([10.0, 20.0, 30.0, 0.0])
+    assert psi(counts, counts * 3) == pytest.approx(0.0)
+
+
+def test_identical_distribution_is_stable(baseline):
+    live = baseline.empty()
+    live.update(_frame(20_000, 1))
+    columns = _columns(live, baseline)
+    assert all(c["psi"] < PSI_MODERATE and c["status"] == "stable" for c in columns.values())
+
+
+def test_shifted_inputs_and_new_labels_drift(baseline):
+    live = baseline.empty()
+    live.update(_frame(20_000, 1, shift=0.1, vendors=("A", "Z")))
+    columns = _columns(live, baseline)
+    assert columns["VendorOnTimeRate"]["psi"] > PSI_SIGNIFICANT
+    assert columns["Vendor"]["status"] == "drift"
+    assert columns["Vendor"]["live"]["unseen_share"] == pytest.approx(0.5, abs=0.02)
+    assert set(columns["Vendor"]["unseen_labels"]) == {"Z"}
+    assert columns["Cost_Overrun_Pct"]["status"] == "stable"
+
+
+def test_columns_uploads_never_carry_are_reported_separately(baseline):
+    monitor = DriftMonitor("v1", baseline)
+    monitor.observe("v1", _frame(5_000, 1, escalation=False))
+    report = monitor.report()
+    assert report["absent_columns"] == ["CostEscalation"]
+    assert "CostEscalation" not in [c["column"] for c in report["columns"]]
+    assert report["status"] == "stable" and report["max_psi"] < PSI_MODERATE
+
+
+def test_decay_follows_recent_traffic(baseline):
+    live = baseline.empty(half_life_rows=1_000)
+    live.update(_frame(5_000, 1, shift=0.1))
+    for seed in range(2, 12):
+        live.update(_frame(2_000, seed))
+    assert _columns(live, baseline)["VendorOnTimeRate"]["status"] == "stable"
+    assert live.weight() < 3_000
+
+
+def test_round_trips_through_dict(baseline):
+    restored = DriftSketch.from_dict(baseline.to_dict())
+    live = restored.empty()
+    live.update(_frame(5_000, 1))
+    np.testing.assert_allclose(restored.counts["VendorOnTimeRate"], baseline.counts["VendorOnTimeRate"])
+    assert live.compare(restored)[0]["psi"] == pytest.approx(live.compare(baseline)[0]["psi"])
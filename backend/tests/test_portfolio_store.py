@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_store import OUTPUT_COLUMNS, PortfolioStore
+
+
+def _scorer(version):
+    seen = []
+
+    def score(df):
+        seen.append(df.copy())
+        return df.assign(
+            Predicted_Cost=df["EstimatedCost"] * 1.1,
+            Predicted_Timeline=df["EstimatedTimeline"] * 1.2,
+            Cost_Overrun_Pct=10.0,
+            Timeline_Overrun_Pct=20.0,
+            Overall_Risk="Medium",
+        ), version
+    score.seen = seen
+    return score
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PortfolioStore(str(tmp_path / "portfolio.db"), rescore_rows=2)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def upload():
+    return pd.DataFrame({
+        "ProjectID": ["P1", "P2", "P3"],
+        "ProjectType": ["Substation", "Overhead Line", "Substation"],
+        "ProjectLength": [108.34443199740028, 0.1 + 0.2, 1.0765809496561254],
+        "VendorOnTimeRate": [0.7733422708754739, 0.47138165242080166, 0.8531703781409838],
+        "EstimatedCost": [1381803.9894104004, 2.5e6 / 3, 7.0],
+        "EstimatedTimeline": [400.0, 500.0, 600.0],
+    })
+
+
+def test_upsert_only_rescores_changed_rows(store, upload):
+    assert store.upsert(upload, "v1", _scorer("v1"))["rescored"] == 3
+    assert store.upsert(upload, "v1", _scorer("v1")) == {"received": 3, "skipped": 0, "rescored": 0, "unchanged": 3}
+
+    changed = upload.copy()
+    changed.loc[1, "EstimatedCost"] += 1
+    assert store.upsert(changed, "v1", _scorer("v1"))["rescored"] == 1
+    # A new model version rescores everything
+    assert store.upsert(changed, "v2", _scorer("v2"))["rescored"] == 3
+
+
+def test_inputs_round_trip_through_rescore(store, upload):
+    store.upsert(upload, "v1", _scorer("v1"))
+    rescore = _scorer("v2")
+    assert store.rescore_stale(lambda: "v2", rescore) == 3
+    assert store.stats("v2")["stale"] == 0
+
+    rescored = pd.concat(rescore.seen).set_index("ProjectID").loc[upload["ProjectID"]]
+    page, total = store.query({}, sort="ProjectID")
+    assert total == 3
+    for frame in (rescored, page.set_index("ProjectID")):
+        for col in ["ProjectLength", "VendorOnTimeRate", "EstimatedCost"]:
+            np.testing.assert_allclose(frame[col].to_numpy(np.float64), upload[col].to_numpy(), rtol=1e-15, atol=0)
+    assert page["ProjectLength"].iloc[0] == 108.34443199740028
+    # The rescore reproduces the outputs computed from the original inputs
+    np.testing.assert_allclose(page["Predicted_Cost"], upload["EstimatedCost"] * 1.1, rtol=1e-15)
+    assert list(page.columns[-len(OUTPUT_COLUMNS):]) == OUTPUT_COLUMNS
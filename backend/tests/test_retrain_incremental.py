@@ -0,0 +1,45 @@
+import os
+import warnings
+
+import joblib
+import numpy as np
+import pytest
+
+from generate_data import generate_rows
+from feature_engineering import get_feature_engineer
+from model_bundle import OVERRUN_MODEL_KEYS, booster_predict
+from retrain_incremental import NON_FEATURE_COLUMNS, continue_boosting, warm_start
+from train_overrun import TARGETS, add_overrun_targets
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def bundled_models():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return joblib.load(os.path.join(BACKEND, "best_models.pkl"))
+
+
+def test_continue_boosting_warm_starts_the_bundled_artifact(bundled_models):
+    rows = add_overrun_targets(generate_rows(500, np.random.default_rng(0))).dropna(subset=TARGETS)
+    X = get_feature_engineer(bundled_models).transform(rows.drop(columns=[c for c in NON_FEATURE_COLUMNS if c in rows.columns]))
+
+    for target, key in zip(TARGETS, OVERRUN_MODEL_KEYS):
+        model = bundled_models[key]
+        before = model.get_booster().num_boosted_rounds()
+        updated = continue_boosting(model, X, rows[target], rounds=5)
+        assert updated.get_booster().num_boosted_rounds() == before + 5
+        assert np.isfinite(booster_predict(updated, X)).all()
+
+
+def test_warm_start_refreshes_metrics_and_drift_baseline(bundled_models):
+    rows = add_overrun_targets(generate_rows(500, np.random.default_rng(1))).dropna(subset=TARGETS)
+    updated = warm_start(bundled_models, rows, rounds=5)
+
+    assert updated["drift_baseline"]["rows"] == 400
+    assert "Cost_Overrun_Pct" in updated["drift_baseline"]["counts"]
+    assert set(updated["metrics"]) == set(TARGETS)
+    assert updated["metrics"] != bundled_models.get("metrics")
+    # The parent artifact is left as it was
+    assert "drift_baseline" not in bundled_models
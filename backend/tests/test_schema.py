@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from schema import REQUIRED_COLUMNS, validate_and_standardize, validate_frame
+
+
+def _frame(**overrides):
+    df = pd.DataFrame({
+        "ProjectID": ["P1", "P2", "P3"],
+        "ProjectType": ["Substation", "Overhead Line", "Underground Cable"],
+        "Terrain": ["Plains", "Hilly", "Coastal"],
+        "Vendor": ["A", "B", "C"],
+        "WeatherImpact": ["Low", "High", "Medium"],
+        "DemandSupply": ["Balanced", "Shortage", "Surplus"],
+        "Resources": [10, 20, 30],
+        "ProjectLength": [108.34443199740028, 55.5, 12.25],
+        "RegulatoryTime": [30.0, 45.0, 60.0],
+        "HistoricalDelay": [5.0, 10.0, 0.0],
+        "EstimatedCost": [1.2e6, 3.4e6, 5.6e6],
+        "EstimatedTimeline": [400.0, 500.0, 600.0],
+        "StartMonth": [1, 6, 12],
+        "VendorOnTimeRate": [0.9, 0.8, 0.7],
+    })
+    for name, values in overrides.items():
+        df[name] = values
+    return df
+
+
+def test_clean_frame_has_no_errors():
+    df, warnings, errors = validate_frame(_frame())
+    assert errors.empty
+    assert warnings == []
+
+
+def test_echoed_floats_keep_full_precision():
+    df, _ = validate_and_standardize(_frame())
+    assert df["ProjectLength"].dtype == np.float64
+    assert df["ProjectLength"].iloc[0] == 108.34443199740028
+    assert df["VendorOnTimeRate"].tolist() == [0.9, 0.8, 0.7]
+
+
+def test_missing_required_column_raises():
+    with pytest.raises(ValueError, match="Missing required columns"):
+        validate_frame(_frame().drop(columns=["Terrain"]))
+
+
+def test_error_rows_by_kind():
+    df, warnings, errors = validate_frame(_frame(
+        Terrain=["Plains", None, "Coastal"],
+        RegulatoryTime=["30", "soon", "60"],
+        StartMonth=[1, 13, 12],
+        VendorOnTimeRate=[0.9, 0.8, 1.5],
+    ))
+    found = set(map(tuple, errors[["row", "column", "error"]].to_numpy().tolist()))
+    assert found == {
+        (1, "Terrain", "missing required value(s)"),
+        (1, "RegulatoryTime", "non-numeric value(s) set to NaN"),
+        (1, "StartMonth", "value(s) outside [1, 12]"),
+        (2, "VendorOnTimeRate", "value(s) outside [0, 1]"),
+    }
+    # Unparseable numbers become NaN; out-of-range values are kept
+    assert np.isnan(df.at[1, "RegulatoryTime"]) and df.at[0, "RegulatoryTime"] == 30.0
+    assert df.at[2, "VendorOnTimeRate"] == 1.5
+    assert any("Column 'RegulatoryTime': 1" in w for w in warnings)
+
+
+def test_error_rows_use_frame_index():
+    df = _frame(StartMonth=[0, 6, 12]).set_axis([10, 11, 12])
+    _, _, errors = validate_frame(df)
+    assert errors["row"].tolist() == [10]
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from serialization import _widen_float32, json_records
+
+
+def test_widen_float32_matches_shortest_repr():
+    values = np.random.default_rng(0).normal(0, 50, 10_000).astype(np.float32)
+    values[:4] = [0.7656, 0, np.nan, np.inf]
+    widened = _widen_float32(pd.Series(values))
+    expected = pd.Series(values).astype(str).astype(np.float64)
+    np.testing.assert_array_equal(widened.to_numpy(), expected.to_numpy())
+    assert widened.iloc[0] == 0.7656
+
+
+def test_json_records_keeps_float64_and_drops_non_finite():
+    df = pd.DataFrame({
+        "ProjectLength": [108.34443199740028, np.nan],
+        "Cost_Overrun_Pct": np.array([15.150336, np.inf], dtype=np.float32),
+    })
+    assert json_records(df) == [
+        {"ProjectLength": 108.34443199740028, "Cost_Overrun_Pct": 15.150336},
+        {"ProjectLength": None, "Cost_Overrun_Pct": None},
+    ]
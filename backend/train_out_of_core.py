@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Out-of-core training of the overrun models from CSV/Parquet shards.
+
+The data is never loaded whole: a first streaming pass fits the encoder,
+then each target trains on an XGBoost external-memory matrix fed chunk by
+chunk. Rows are split into train/validation by hashing ProjectID, so the
+split is stable across runs and shard layouts. Saves the same artifact
+layout as train_overrun.py.
+"""
+
+import argparse
+import os
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from data_io import expand_paths, iter_shards
+from drift import capture_baseline, with_predictions
+from feature_engineering import FeatureEngineer
+from model_bundle import booster_predict
+from retrain_incremental import NON_FEATURE_COLUMNS
+from train_overrun import TARGETS, add_overrun_targets
+
+
+DEFAULT_PARAMS = {
+    'objective': 'reg:squarederror',
+    'tree_method': 'hist',
+    'max_depth': 6,
+    'learning_rate': 0.05,
+    'subsample': 0.9,
+    'colsample_bytree': 0.9,
+    'max_bin': 256,
+}
+
+
+def is_validation(df: pd.DataFrame, valid_pct: int) -> np.ndarray:
+    """Deterministic split: hash ProjectID (whole row if absent) into 100 buckets."""
+    key = df['ProjectID'] if 'ProjectID' in df.columns else df
+    return (pd.util.hash_pandas_object(key, index=False).to_numpy() % 100) < valid_pct
+
+
+def iter_encoded(paths, chunksize, feature_engineer, valid_pct, validation):
+    """Yield (X float32, targets frame) for one side of the split."""
+    for chunk in iter_shards(paths, chunksize):
+        chunk = add_overrun_targets(chunk).dropna(subset=TARGETS)
+        chunk = chunk[is_validation(chunk, valid_pct) == validation]
+        if len(chunk):
+            X = feature_engineer.transform(chunk.drop(columns=NON_FEATURE_COLUMNS, errors='ignore'))
+            yield X, chunk[TARGETS].to_numpy(dtype=np.float32)
+
+
+class ShardIter(xgb.DataIter):
+    """Feeds one target of one split side to XGBoost, a chunk at a time."""
+
+    def __init__(self, target_index, cache_prefix, **encoded_kwargs):
+        self._target_index = target_index
+        self._encoded_kwargs = encoded_kwargs
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = iter_encoded(**self._encoded_kwargs)
+        item = next(self._chunks, None)
+        if item is None:
+            return False
+        X, y = item
+        input_data(data=X, label=y[:, self._target_index])
+        return True
+
+    def reset(self):
+        self._chunks = None
+
+
+def external_matrix(data_iter, ref=None, max_bin=256):
+    if hasattr(xgb, 'ExtMemQuantileDMatrix'):
+        return xgb.ExtMemQuantileDMatrix(data_iter, ref=ref, max_bin=max_bin)
+    # xgboost < 3.0: plain external-memory DMatrix
+    return xgb.DMatrix(data_iter)
+
+
+def to_regressor(booster):
+    """Wrap a Booster as an XGBRegressor so the artifact matches train_overrun.py."""
+    model = xgb.XGBRegressor()
+    model.load_model(bytearray(booster.save_raw('json')))
+    return model
+
+
+def iter_baseline(paths, chunksize, feature_engineer, valid_pct, models):
+    """Training-side rows with the final models' predictions, for the drift baseline."""
+    for chunk in iter_shards(paths, chunksize):
+        chunk = chunk[~is_validation(chunk, valid_pct)]
+        if len(chunk):
+            inputs = chunk.drop(columns=NON_FEATURE_COLUMNS, errors='ignore')
+            yield with_predictions(inputs, models, feature_engineer.transform(inputs))
+
+
+def streaming_metrics(models, **encoded_kwargs) -> dict:
+    """Validation R²/MAE per target, accumulated chunk by chunk."""
+    sums = {t: np.zeros(5) for t in TARGETS}  # n, sum y, sum y², sum |err|, sum err²
+    for X, y in iter_encoded(**encoded_kwargs):
+        for i, target in enumerate(TARGETS):
+            err = y[:, i].astype(np.float64) - booster_predict(models[target], X)
+            sums[target] += [len(err), y[:, i].sum(dtype=np.float64), np.square(y[:, i], dtype=np.float64).sum(),
+                             np.abs(err).sum(), np.square(err).sum()]
+    metrics = {}
+    for target, (n, s, s2, sae, sse) in sums.items():
+        total = s2 - s * s / n if n else 0.0
+        metrics[target] = {
+            'r2': float(1.0 - sse / total) if total > 0 else float('nan'),
+            'mae': float(sae / n) if n else float('nan'),
+            'rows': int(n),
+        }
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train overrun models out-of-core from CSV/Parquet shards")
+    parser.add_argument("--shards", nargs="+", required=True,
+                        help="Files, directories or glob patterns of labeled CSV/Parquet shards")
+    parser.add_argument("--output", default="best_models.pkl")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Rows per chunk fed to XGBoost")
+    parser.add_argument("--rounds", type=int, default=2000, help="Maximum boosting rounds")
+    parser.add_argument("--early-stopping-rounds", type=int, default=50)
+    parser.add_argument("--valid-pct", type=int, default=10, help="Percent of ProjectIDs held out for validation")
+    parser.add_argument("--threads", type=int, default=None, help="XGBoost threads (default: all cores)")
+    parser.add_argument("--cache-dir", default=None, help="Where XGBoost writes its external-memory pages")
+    args = parser.parse_args(argv)
+
+    paths = expand_paths(args.shards)
+    if not paths:
+        raise SystemExit(f"No shards matched {args.shards}")
+
+    print(f"Fitting encoder on {len(paths)} shard(s)...")
+    feature_engineer = FeatureEngineer().fit_stream(
+        chunk.drop(columns=NON_FEATURE_COLUMNS, errors='ignore') for chunk in iter_shards(paths, args.chunksize)
+    )
+    print(f"Features: {len(feature_engineer.feature_names)}")
+
+    params = dict(DEFAULT_PARAMS)
+    if args.threads:
+        params['nthread'] = args.threads
+    encoded = dict(paths=paths, chunksize=args.chunksize, feature_engineer=feature_engineer, valid_pct=args.valid_pct)
+
+    models = {}
+    with tempfile.TemporaryDirectory(dir=args.cache_dir) as cache_dir:
+        for i, target in enumerate(TARGETS):
+            prefix = os.path.join(cache_dir, target)
+            dtrain = external_matrix(ShardIter(i, prefix + '-train', validation=False, **encoded),
+                                     max_bin=params['max_bin'])
+            dvalid = external_matrix(ShardIter(i, prefix + '-valid', validation=True, **encoded),
+                                     ref=dtrain, max_bin=params['max_bin'])
+            print(f"{target}: {dtrain.num_row()} train / {dvalid.num_row()} validation rows")
+            booster = xgb.train(params, dtrain, num_boost_round=args.rounds, evals=[(dvalid, 'valid')],
+                                early_stopping_rounds=args.early_stopping_rounds, verbose_eval=False)
+            models[target] = to_regressor(booster)
+            print(f"{target}: stopped at {booster.best_iteration + 1} rounds")
+            del dtrain, dvalid
+
+    metrics = streaming_metrics(models, validation=True, **encoded)
+    for target, m in metrics.items():
+        print(f"{target}: validation R²={m['r2']:.4f} MAE={m['mae']:.3f} ({m['rows']} rows)")
+
+    best_models = {
+        'cost_overrun_model': models['CostOverrunPct'],
+        'timeline_overrun_model': models['TimelineOverrunPct'],
+        'feature_names': list(feature_engineer.feature_names),
+        'feature_engineer': feature_engineer,
+        'metrics': metrics,
+    }
+    print("Capturing drift baseline...")
+    best_models['drift_baseline'] = capture_baseline(
+        iter_baseline(paths, args.chunksize, feature_engineer, args.valid_pct, best_models), feature_engineer)
+    joblib.dump(best_models, args.output)
+    print(f"Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
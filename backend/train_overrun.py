@@ -4,13 +4,35 @@ Train models to predict cost and timeline overruns (%).
 Saves models and feature metadata to best_models.pkl under overrun keys.
 """
 
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
 import numpy as np
 import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score, mean_absolute_error
 import xgboost as xgb
-from feature_engineering import apply_feature_engineering
+from drift import capture_baseline, with_predictions
+from feature_engineering import FeatureEngineer
+
+
+TARGETS = ['CostOverrunPct', 'TimelineOverrunPct']
+
+
+def add_overrun_targets(df: pd.DataFrame) -> pd.DataFrame:
+    """Overrun % of actual TotalCost/Timeline over the estimates; the training targets."""
+    df['CostOverrunPct'] = ((df['TotalCost'] - df['EstimatedCost']) / df['EstimatedCost']) * 100.0
+    df['TimelineOverrunPct'] = ((df['Timeline'] - df['EstimatedTimeline']) / df['EstimatedTimeline']) * 100.0
+    return df
+
+
+def evaluate(model, X, y) -> dict:
+    pred = model.predict(X)
+    return {'r2': float(r2_score(y, pred)), 'mae': float(mean_absolute_error(y, pred)), 'rows': int(len(y))}
 
 
 def create_sample_data(n_samples: int = 3600, seed: int = 42) -> pd.DataFrame:
@@ -88,79 +110,189 @@ def create_sample_data(n_samples: int = 3600, seed: int = 42) -> pd.DataFrame:
     df['Timeline'] = df['Timeline'].clip(lower=1)
 
     # Overrun targets
-    df['CostOverrunPct'] = ((df['TotalCost'] - df['EstimatedCost']) / df['EstimatedCost']) * 100.0
-    df['TimelineOverrunPct'] = ((df['Timeline'] - df['EstimatedTimeline']) / df['EstimatedTimeline']) * 100.0
+    df = add_overrun_targets(df)
     avg_over = (df['CostOverrunPct'].abs() + df['TimelineOverrunPct'].abs()) / 2
     df['Overall_Risk'] = np.where(avg_over < 10, 'Low', np.where(avg_over < 30, 'Medium', 'High'))
     return df
 
 
-def train_regressor(X_train, X_test, y_train, y_test, name: str):
-    # Hold out 10% of X_train for early stopping
-    from sklearn.model_selection import train_test_split
-    X_tr, X_val, y_tr, y_val = train_test_split(X_train, y_train, test_size=0.1, random_state=42)
+# The original hand-picked candidates; used by --search fixed (the default)
+FIXED_CANDIDATES = [
+    dict(n_estimators=600, max_depth=6, learning_rate=0.05, subsample=0.9, colsample_bytree=0.9, reg_lambda=1.0, reg_alpha=0.0),
+    dict(n_estimators=800, max_depth=7, learning_rate=0.045, subsample=0.85, colsample_bytree=0.9, reg_lambda=1.2, reg_alpha=0.0),
+    dict(n_estimators=900, max_depth=8, learning_rate=0.04, subsample=0.85, colsample_bytree=0.95, reg_lambda=1.0, reg_alpha=0.1),
+]
+
+MAX_ROUNDS = 2000
 
-    candidates = [
-        dict(n_estimators=600, max_depth=6, learning_rate=0.05, subsample=0.9, colsample_bytree=0.9, reg_lambda=1.0, reg_alpha=0.0),
-        dict(n_estimators=800, max_depth=7, learning_rate=0.045, subsample=0.85, colsample_bytree=0.9, reg_lambda=1.2, reg_alpha=0.0),
-        dict(n_estimators=900, max_depth=8, learning_rate=0.04, subsample=0.85, colsample_bytree=0.95, reg_lambda=1.0, reg_alpha=0.1),
-    ]
 
-    best = None
-    best_score = -1e9
-    for i, params in enumerate(candidates):
-        model = xgb.XGBRegressor(
-            random_state=42,
-            tree_method="hist",
-            **params,
+def sample_candidates(n: int, seed: int = 42) -> list:
+    """Draw ``n`` random XGBoost configurations from the search space."""
+    rng = np.random.default_rng(seed)
+    return [
+        dict(
+            n_estimators=MAX_ROUNDS,
+            max_depth=int(rng.choice([4, 5, 6, 7, 8, 10])),
+            learning_rate=float(np.exp(rng.uniform(np.log(0.02), np.log(0.15)))),
+            subsample=float(rng.uniform(0.6, 1.0)),
+            colsample_bytree=float(rng.uniform(0.6, 1.0)),
+            min_child_weight=float(rng.choice([1, 2, 4, 8])),
+            reg_lambda=float(np.exp(rng.uniform(np.log(0.5), np.log(5.0)))),
+            reg_alpha=float(rng.choice([0.0, 0.01, 0.1, 0.5])),
         )
-        # Fit without early stopping for maximum version compatibility
-        model.fit(X_tr, y_tr)
-        pred = model.predict(X_test)
-        r2 = r2_score(y_test, pred)
-        mae = mean_absolute_error(y_test, pred)
-        print(f"{name} cand#{i+1} → R²={r2:.4f} MAE={mae:.2f}")
-        if r2 > best_score:
-            best_score = r2
-            best = model
-
-    # Final report
-    pred = best.predict(X_test)
-    r2 = r2_score(y_test, pred)
-    mae = mean_absolute_error(y_test, pred)
-    print(f"{name} (chosen) → R²={r2:.4f} MAE={mae:.2f}")
+        for _ in range(n)
+    ]
+
+
+def _fit_candidate(params, X_tr, y_tr, X_val, y_val, n_threads: int, early_stopping_rounds: int):
+    model = xgb.XGBRegressor(
+        random_state=42,
+        tree_method="hist",
+        n_jobs=n_threads,
+        early_stopping_rounds=early_stopping_rounds,
+        **params,
+    )
+    model.fit(X_tr, y_tr, eval_set=[(X_val, y_val)], verbose=False)
+    # predict() honours best_iteration from early stopping
+    return model, r2_score(y_val, model.predict(X_val))
+
+
+def _evaluate(executor, candidates, data, n_threads, early_stopping_rounds, deadline=None):
+    """
+    Fit ``candidates`` (in ``executor`` when given) and return
+    [(params, model, val_r2)] for those finished before ``deadline``, in
+    ``candidates`` order. At least one result is always returned.
+    """
+    results = []
+    if executor is None:
+        for params in candidates:
+            if results and deadline is not None and time.monotonic() > deadline:
+                break
+            results.append((params, *_fit_candidate(params, *data, n_threads, early_stopping_rounds)))
+        return results
+
+    pending = {executor.submit(_fit_candidate, params, *data, n_threads, early_stopping_rounds): i
+               for i, params in enumerate(candidates)}
+    finished = []
+    while pending:
+        timeout = None if deadline is None or not finished else max(0.0, deadline - time.monotonic())
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            finished.append((pending.pop(future), future.result()))
+    for future in pending:
+        # Out of budget; queued fits are dropped, running ones can't be interrupted and finish unobserved
+        future.cancel()
+    # Completion order depends on scheduling; report in search-list order
+    return [(candidates[i], *result) for i, result in sorted(finished, key=lambda item: item[0])]
+
+
+def train_regressor(X_train, X_test, y_train, y_test, name: str, executor=None, search: str = "fixed",
+                    n_candidates: int = 12, threads_per_fit: int = 1, early_stopping_rounds: int = 50,
+                    deadline: float = None, seed: int = 42):
+    # Hold out 10% of X_train for early stopping and model selection
+    X_tr, X_val, y_tr, y_val = train_test_split(X_train, y_train, test_size=0.1, random_state=42)
+    data = (X_tr, y_tr, X_val, y_val)
+
+    if search == "halving":
+        # Successive halving: many configs on few rounds, the best third gets 3x the rounds
+        pool, rounds, eta = sample_candidates(n_candidates, seed), 100, 3
+        while True:
+            results = _evaluate(executor, [dict(p, n_estimators=rounds) for p in pool], data,
+                                threads_per_fit, early_stopping_rounds, deadline)
+            results.sort(key=lambda r: r[2], reverse=True)
+            print(f"{name} halving: {len(results)} configs @ {rounds} rounds → best val R²={results[0][2]:.4f}")
+            out_of_time = deadline is not None and time.monotonic() > deadline
+            if len(results) <= 1 or rounds >= MAX_ROUNDS or out_of_time:
+                break
+            pool = [params for params, _, _ in results[:max(1, len(results) // eta)]]
+            rounds = min(rounds * eta, MAX_ROUNDS)
+    else:
+        candidates = sample_candidates(n_candidates, seed) if search == "random" else FIXED_CANDIDATES
+        results = _evaluate(executor, candidates, data, threads_per_fit, early_stopping_rounds, deadline)
+        # Label by position in the search list, so a number always names the same config
+        position = {id(params): i for i, params in enumerate(candidates)}
+        for params, model, val_r2 in results:
+            print(f"{name} cand#{position[id(params)] + 1} → val R²={val_r2:.4f} trees={model.best_iteration + 1} "
+                  f"depth={params['max_depth']} lr={params['learning_rate']:.3f}")
+
+    params, best, val_r2 = max(results, key=lambda r: r[2])
+
+    # Final report on the untouched test split
+    test = evaluate(best, X_test, y_test)
+    print(f"{name} (chosen) → val R²={val_r2:.4f} test R²={test['r2']:.4f} MAE={test['mae']:.2f}")
     return best
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train cost and timeline overrun models")
+    parser.add_argument("--search", choices=["fixed", "random", "halving"], default="fixed",
+                        help="fixed: the 3 hand-picked configs; random / halving: sample --candidates configs")
+    parser.add_argument("--candidates", type=int, default=12, help="Configs sampled for random / halving search")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel fits (processes); default CPU count / --threads-per-fit")
+    parser.add_argument("--threads-per-fit", type=int, default=1, help="XGBoost threads per fit")
+    parser.add_argument("--early-stopping-rounds", type=int, default=50)
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Wall-clock seconds for the whole search. Fits not yet started are cancelled at the deadline; "
+                             "fits already running finish, so the run can overshoot by up to one fit")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    jobs = args.jobs or max(1, (os.cpu_count() or 1) // args.threads_per_fit)
+    deadline = time.monotonic() + args.time_budget if args.time_budget else None
+
     print("Training overrun models...")
     df = create_sample_data()
 
-    targets = ['CostOverrunPct', 'TimelineOverrunPct']
-    X = df.drop(columns=targets + ['ProjectID', 'TotalCost', 'Timeline', 'Overall_Risk'])
+    X = df.drop(columns=TARGETS + ['ProjectID', 'TotalCost', 'Timeline', 'Overall_Risk'])
     y_cost = df['CostOverrunPct']
     y_time = df['TimelineOverrunPct']
 
     X_train, X_test, y_cost_train, y_cost_test = train_test_split(X, y_cost, test_size=0.2, random_state=42)
     _, _, y_time_train, y_time_test = train_test_split(X, y_time, test_size=0.2, random_state=42)
 
-    X_train_fe = apply_feature_engineering(X_train)
-    X_test_fe = apply_feature_engineering(X_test)
+    # One fitted encoding for both splits so their columns always line up
+    feature_engineer = FeatureEngineer()
+    X_train_fe = feature_engineer.fit_transform(X_train)
+    X_test_fe = feature_engineer.transform(X_test)
+
+    print(f"Feature shape: {X_train_fe.shape} | search={args.search} jobs={jobs} threads/fit={args.threads_per_fit}")
+    search_kwargs = dict(search=args.search, n_candidates=args.candidates, threads_per_fit=args.threads_per_fit,
+                         early_stopping_rounds=args.early_stopping_rounds, deadline=deadline, seed=args.seed)
 
-    print(f"Feature shape: {X_train_fe.shape}")
-    cost_over_model = train_regressor(X_train_fe, X_test_fe, y_cost_train, y_cost_test, 'CostOverrunPct')
-    time_over_model = train_regressor(X_train_fe, X_test_fe, y_time_train, y_time_test, 'TimelineOverrunPct')
+    executor = None
+    if jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        # Both targets search concurrently and share the process pool
+        with ThreadPoolExecutor(max_workers=2) as targets_pool:
+            cost_future = targets_pool.submit(train_regressor, X_train_fe, X_test_fe, y_cost_train, y_cost_test,
+                                              'CostOverrunPct', executor, **search_kwargs)
+            time_future = targets_pool.submit(train_regressor, X_train_fe, X_test_fe, y_time_train, y_time_test,
+                                              'TimelineOverrunPct', executor, **search_kwargs)
+            cost_over_model = cost_future.result()
+            time_over_model = time_future.result()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
 
     best_models = {
         'cost_overrun_model': cost_over_model,
         'timeline_overrun_model': time_over_model,
-        'feature_names': list(X_train_fe.columns),
+        'feature_names': list(feature_engineer.feature_names),
+        'feature_engineer': feature_engineer,
+        # Test-split reference error; retrain_incremental compares new actuals against it
+        'metrics': {
+            'CostOverrunPct': evaluate(cost_over_model, X_test_fe, y_cost_test),
+            'TimelineOverrunPct': evaluate(time_over_model, X_test_fe, y_time_test),
+        },
     }
+    # Training inputs and predictions; the API's /drift compares live traffic against them
+    best_models['drift_baseline'] = capture_baseline([with_predictions(X_train, best_models, X_train_fe)], feature_engineer)
     joblib.dump(best_models, 'best_models.pkl')
     print("Saved best_models.pkl")
 
 
 if __name__ == '__main__':
     main()
-
-
@@ -7,6 +7,61 @@ import {
 
 const COLORS = ['#e5e7eb', '#9ca3af', '#6b7280']
 
+const API_URL = 'https://mlpowegridbackend-production.up.railway.app'
+
+// Only the columns the per-project charts and table render; keeps /predict responses small
+const API_FIELDS = [
+  'ProjectID', 'ProjectType', 'Terrain', 'EstimatedCost', 'EstimatedTimeline', 'TotalCost', 'Timeline',
+  'CostEscalation', 'Predicted_*', 'Cost_Overrun_Pct', 'Timeline_Overrun_Pct', 'Overall_Risk'
+].join(',')
+
+// Summary metrics, risk counts, per-group averages and the top projects come from /aggregate
+const AGGREGATE_PARAMS = 'by=ProjectType,Terrain&top_n=8'
+
+async function postUpload(path, file) {
+  const fdata = new FormData()
+  fdata.append('file', file)
+  const res = await fetch(`${API_URL}${path}`, { method: 'POST', body: fdata })
+  return res.ok ? res.json() : null
+}
+
+function statsFromAggregate(agg) {
+  const s = agg.summary ?? {}
+  const n = (v) => v ?? 0
+  return {
+    total: agg.rows,
+    avgCost: n(s.mean_Predicted_Cost),
+    avgTimeline: n(s.mean_Predicted_Timeline),
+    avgCostOverrun: n(s.mean_Cost_Overrun_Pct),
+    avgTimelineOverrun: n(s.mean_Timeline_Overrun_Pct),
+    avgEstimatedCost: n(s.mean_EstimatedCost),
+    avgEstimatedTimeline: n(s.mean_EstimatedTimeline),
+    avgCostDelta: n(s.mean_Predicted_Cost) - n(s.mean_EstimatedCost),
+    avgTimeDelta: n(s.mean_Predicted_Timeline) - n(s.mean_EstimatedTimeline),
+    // Predicted = Estimated * (1 + overrun / 100), so (Pred-Est)/Est is the overrun itself
+    avgCostDiffPct: n(s.mean_Cost_Overrun_Pct),
+    avgTimeDiffPct: n(s.mean_Timeline_Overrun_Pct),
+    countPredCostAboveEst: n(s.cost_over_estimate),
+    countPredTimeAboveEst: n(s.timeline_over_estimate),
+    maxCost: n(s.max_Predicted_Cost),
+    minCost: n(s.min_Predicted_Cost),
+    maxTimeline: n(s.max_Predicted_Timeline),
+    minTimeline: n(s.min_Predicted_Timeline),
+    highRisk: agg.risk_counts?.High ?? 0
+  }
+}
+
+function groupsFromAggregate(agg, dimension) {
+  return (agg.groups?.[dimension] ?? []).map(g => ({
+    name: g.name,
+    avgCost: g.mean_Predicted_Cost ?? 0,
+    avgTimeline: g.mean_Predicted_Timeline ?? 0,
+    avgCO: g.mean_Cost_Overrun_Pct ?? 0,
+    avgTO: g.mean_Timeline_Overrun_Pct ?? 0,
+    count: g.count
+  }))
+}
+
 function readCsv(file) {
   return new Promise((resolve, reject) => {
     Papa.parse(file, {
@@ -30,6 +85,7 @@ function metric(value, label) {
 
 export default function App() {
   const [rows, setRows] = useState([])
+  const [agg, setAgg] = useState(null)
   const [error, setError] = useState('')
   const [showIntro, setShowIntro] = useState(() => {
     try { return localStorage.getItem('pg_hide_intro') !== '1' } catch { return true }
@@ -40,20 +96,18 @@ export default function App() {
     const file = e.target.files?.[0]
     if (!file) return
     try {
-      // Try API if available, fallback to local CSV parsing
-      const fdata = new FormData()
-      fdata.append('file', file)
-      try {
-        const res = await fetch('https://mlpowegridbackend-production.up.railway.app/predict', { method: 'POST', body: fdata })
-        if (res.ok) {
-          const json = await res.json()
-          if (json?.rows?.length) {
-            setRows(json.rows)
-            return
-          }
-        }
-      } catch (_) {}
+      // Try API if available, fallback to local CSV parsing (and client-side summaries)
+      const [predicted, aggregated] = await Promise.all([
+        postUpload(`/predict?fields=${encodeURIComponent(API_FIELDS)}`, file).catch(() => null),
+        postUpload(`/aggregate?${AGGREGATE_PARAMS}`, file).catch(() => null)
+      ])
+      if (predicted?.rows?.length) {
+        setAgg(aggregated)
+        setRows(predicted.rows)
+        return
+      }
       const data = await readCsv(file)
+      setAgg(null)
       setRows(data)
     } catch (err) {
       setError('Failed to parse CSV')
@@ -61,6 +115,7 @@ export default function App() {
   }
 
   const stats = useMemo(() => {
+    if (agg) return statsFromAggregate(agg)
     if (!rows.length) return null
     const num = rows.length
     const avg = (arr) => arr.reduce((a, b) => a + (Number(b) || 0), 0) / (arr.length || 1)
@@ -113,9 +168,10 @@ export default function App() {
       maxCost: costs.length ? Math.max(...costs) : 0,
       minCost: costs.length ? Math.min(...costs) : 0,
       maxTimeline: timelines.length ? Math.max(...timelines) : 0,
-      minTimeline: timelines.length ? Math.min(...timelines) : 0
+      minTimeline: timelines.length ? Math.min(...timelines) : 0,
+      highRisk: rows.filter(r => (r.Overall_Risk ?? '').toLowerCase() === 'high').length
     }
-  }, [rows])
+  }, [rows, agg])
 
   const costSeries = useMemo(() => rows.map((r, i) => ({
     x: i + 1,
@@ -136,15 +192,20 @@ export default function App() {
     })), [rows])
 
   const riskCounts = useMemo(() => {
-    const counts = {}
-    rows.forEach(r => {
-      const risk = r.Overall_Risk ?? 'Unknown'
-      counts[risk] = (counts[risk] || 0) + 1
-    })
+    let counts = {}
+    if (agg?.risk_counts) {
+      counts = Object.fromEntries(Object.entries(agg.risk_counts).filter(([, value]) => value > 0))
+    } else {
+      rows.forEach(r => {
+        const risk = r.Overall_Risk ?? 'Unknown'
+        counts[risk] = (counts[risk] || 0) + 1
+      })
+    }
     return Object.entries(counts).map(([name, value], i) => ({ name, value, color: COLORS[i % COLORS.length] }))
-  }, [rows])
+  }, [rows, agg])
 
   const byProjectType = useMemo(() => {
+    if (agg) return groupsFromAggregate(agg, 'ProjectType')
     const map = {}
     rows.forEach(r => {
       const key = r.ProjectType ?? 'Unknown'
@@ -167,9 +228,10 @@ export default function App() {
       avgTO: d.count ? d.sumTO / d.count : 0,
       count: d.count
     }))
-  }, [rows])
+  }, [rows, agg])
 
   const byTerrain = useMemo(() => {
+    if (agg) return groupsFromAggregate(agg, 'Terrain')
     const map = {}
     rows.forEach(r => {
       const key = r.Terrain ?? 'Unknown'
@@ -179,18 +241,19 @@ export default function App() {
       map[key].sumTimeline += Number.isFinite(tl) ? tl : 0
     })
     return Object.values(map).map(d => ({ name: d.name, avgTimeline: d.count ? d.sumTimeline / d.count : 0, count: d.count }))
-  }, [rows])
+  }, [rows, agg])
 
-  const topCost = useMemo(() => {
-    const list = rows.map(r => ({
+  // /aggregate ranks by mean |overrun|; without it, rank the uploaded rows by cost
+  const topProjects = useMemo(() => {
+    const list = (agg?.top ?? rows).map(r => ({
       ProjectID: r.ProjectID ?? '',
       ProjectType: r.ProjectType ?? '',
       cost: Number(r.Predicted_Cost ?? r.TotalCost ?? 0),
       timeline: Number(r.Predicted_Timeline ?? r.Timeline ?? 0),
       risk: r.Overall_Risk ?? ''
     }))
-    return list.sort((a, b) => (b.cost - a.cost)).slice(0, 8)
-  }, [rows])
+    return agg?.top ? list : list.sort((a, b) => (b.cost - a.cost)).slice(0, 8)
+  }, [rows, agg])
 
   return (
     <div className="container">
@@ -241,7 +304,7 @@ export default function App() {
             {metric(stats.total, 'Total Projects')}
             {metric(`₹${stats.avgCost.toFixed(1)}L`, 'Average Cost')}
             {metric(`${stats.avgTimeline.toFixed(1)} mo`, 'Average Timeline')}
-            {metric((rows.filter(r => (r.Overall_Risk ?? '').toLowerCase() === 'high').length), 'High Risk')}
+            {metric(stats.highRisk, 'High Risk')}
           </div>
 
           <div className="grid grid-4" style={{ marginTop: 8 }}>
@@ -433,7 +496,7 @@ export default function App() {
 
           <div className="grid grid-2" style={{ marginTop: 16, marginBottom: 24 }}>
             <div className="glass">
-              <div style={{ marginBottom: 8, color: '#9ca3af' }}>Top Cost Projects</div>
+              <div style={{ marginBottom: 8, color: '#9ca3af' }}>{agg ? 'Top Overrun Projects' : 'Top Cost Projects'}</div>
               <div style={{ overflowX: 'auto' }}>
                 <table className="table">
                   <thead>
@@ -446,7 +509,7 @@ export default function App() {
                     </tr>
                   </thead>
                   <tbody>
-                    {topCost.map((r, i) => (
+                    {topProjects.map((r, i) => (
                       <tr key={i}>
                         <td>{r.ProjectID}</td>
                         <td>{r.ProjectType}</td>
@@ -464,7 +527,7 @@ export default function App() {
               <div style={{ color: 'var(--muted)', lineHeight: 1.6 }}>
                 <p>Upload a CSV with columns such as ProjectID, ProjectType, TotalCost, Timeline. If Predicted_Cost/Predicted_Timeline exist, those are used; otherwise we fall back to TotalCost/Timeline.</p>
                 <p>Cost Trend and Timeline Trend show simple ordered series to visualize spread and volatility. The Risk Distribution pie is driven by the Overall_Risk column if present.</p>
-                <p>Average breakdown plots help compare categories at a glance. The Top Cost table highlights the highest-cost projects for quick triage.</p>
+                <p>Average breakdown plots help compare categories at a glance. The top projects table highlights the largest predicted overruns (the highest-cost projects when the API is unavailable) for quick triage.</p>
               </div>
             </div>
           </div>